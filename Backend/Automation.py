@@ -5,7 +5,7 @@ from pywhatkit import search, playonyt  # Import functions for Google search and
 from dotenv import dotenv_values  # Import dotenv to manage environment variables.
 from bs4 import BeautifulSoup  # Import BeautifulSoup for parsing HTML content.
 from rich import print  # Import for styled console output.
-from groq import Groq  # Import Groq AI chat functionalities.
+from Backend import LLM  # Shared pooled model clients.
 import webbrowser  # Import for opening URLs.
 import subprocess  # Import for interacting with the system.
 import requests  # Import for making HTTP requests.
@@ -15,7 +15,6 @@ import os  # Import os for operating system functionalities.
 
 # Load environment variables from the .env file.
 env_vars = dotenv_values(".env")  
-GroqAPIKey = env_vars.get("GroqAPIKey") or "K9UtGtqwVaMog42rMFJZnG9oFpxEBI2RGptg4UN6" # Retrieve the Groq API key.
 
 # Define CSS classes for parsing specific elements in HTML content.
 classes = ["zCubwf", "hgKElc", "LTKOO", "sY7ric", "Z0LcW", "gsrt vk_bk FzvWSb YwPhnf", "pclqee", "tw-Data-text tw-text-small tw-ta",
@@ -25,9 +24,6 @@ classes = ["zCubwf", "hgKElc", "LTKOO", "sY7ric", "Z0LcW", "gsrt vk_bk FzvWSb Yw
 # Define a user-agent for making web requests.
 useragent = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/100.0.4896.75 Safari/537.36'
 
-# Initialize the `Groq client` with the API key.
-client = Groq(api_key=GroqAPIKey)
-
 # Predefined professional responses for user interactions.
 professional_responses = [
     "Your satisfaction is my top priority; feel free to reach out if there's anything else I can help you with.",
@@ -55,40 +51,25 @@ def Content(Topic):
     def ContentWriterAI(prompt):
         messages.append({'role': "user", "content": f"{prompt}"})  # Add the user's prompt to messages.
 
-        completion = client.chat.completions.create(
-            model="mixtral-8x7b-32768",  # Specify the AI model.
-            messages=SystemChatBot + messages,  # Include system instructions and chat history.
-            max_tokens=2048,  # Limit the maximum tokens in the response.
-            temperature=0.7,  # Adjust response randomness.
-            top_p=1,  # Use nucleus sampling for response diversity.
-            stream=True,  # Enable streaming response.
-            stop=None  # Allow the model to determine stopping conditions.
-        )
-
-        Answer = ""  # Initialize an empty string for the response.
-        # Process streamed response chunks.
+        # Generate the content on the shared Groq connection pool.
+        Answer = LLM.Complete("content", SystemChatBot + messages)
+        Answer = Answer.replace("</s>", "")  # Remove any end-of-sequence tokens
 
-        for chunk in completion:
-            if chunk.choices[0].delta.content:  # Check for content in the current chunk
-                Answer += chunk.choices[0].delta.content  # Append the content to the answer
+        # Add the assistant's response to the messages list
+        messages.append({"role": "assistant", "content": Answer})
 
-            Answer = Answer.replace("</s>", "")  # Remove any end-of-sequence tokens
+        return Answer  # Return the complete response
 
-            # Add the assistant's response to the messages list
-            messages.append({"role": "assistant", "content": Answer})
-
-            return Answer  # Return the complete response
-        
-        Topic: str = Topic.replace("Content ", "", "")  # Remove "Content " from the topic.
-        ContentByAI = ContentWriterAI(Topic)  # Generate content using AI.
+    Topic: str = Topic.replace("Content ", "")  # Remove "Content " from the topic.
+    ContentByAI = ContentWriterAI(Topic)  # Generate content using AI.
 
-# Save the generated content to a text file.
-        with open(f"Data\\{Topic.lower().replace(' ', '')}.txt", "w", encoding="utf-8") as file:
-            file.write(ContentByAI)
-       
+    # Save the generated content to a text file.
+    FilePath = f"Data\\{Topic.lower().replace(' ', '')}.txt"
+    with open(FilePath, "w", encoding="utf-8") as file:
+        file.write(ContentByAI)
 
-        OpenNotepad(rf"Data\Topic.lower().replace(' ', '))).txt")  # Open the file in Notepad.
-        return True  # Indicate success.
+    OpenNotepad(FilePath)  # Open the file in Notepad.
+    return True  # Indicate success.
 
 
 def YouTubeSearch( Topic):
@@ -233,6 +214,8 @@ class Automation:
         self.commands = decision_list
     
     async def execute(self):
-        await Automation(self.commands)
+        # The class shadows the Automation coroutine above, so run the commands directly.
+        async for result in TranslateAndExecute(self.commands):
+            pass
         return True
 
@@ -0,0 +1,87 @@
+import collections  # For LRU ordering
+import threading  # For thread-safe access
+import json  # For on-disk persistence
+import time  # For expiry timestamps
+import os  # For atomic file replacement
+
+# Size-bounded LRU cache with a time-to-live per entry and hit/miss counters.
+# Values must be JSON-serializable when save()/load() are used.
+class TTLCache:
+    def __init__(self, maxsize=1000, ttl=3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.data = collections.OrderedDict()  # key -> (expires_at, value)
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+
+    def get(self, key, default=None):
+        now = time.time()
+        with self.lock:
+            entry = self.data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            if entry[0] <= now:
+                del self.data[key]
+                self.expired += 1
+                self.misses += 1
+                return default
+            self.data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def peek(self, key):
+        """Return (value, seconds_left) without touching LRU order or counters, or None"""
+        with self.lock:
+            entry = self.data.get(key)
+        return None if entry is None else (entry[1], entry[0] - time.time())
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+        with self.lock:
+            self.data[key] = (time.time() + ttl, value)
+            self.data.move_to_end(key)
+            while len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.data.pop(key, None)
+
+    def keys(self):
+        with self.lock:
+            return list(self.data)
+
+    def stats(self):
+        with self.lock:
+            total = self.hits + self.misses
+            return {"size": len(self.data), "hits": self.hits, "misses": self.misses, "expired": self.expired, "hit_rate": self.hits / total if total else 0.0}
+
+    def save(self, path):
+        """Write live entries to path atomically"""
+        now = time.time()
+        with self.lock:
+            entries = [[key, expires, value] for key, (expires, value) in self.data.items() if expires > now]
+        temp_path = path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(entries, f, ensure_ascii=False)
+        os.replace(temp_path, path)
+
+    def load(self, path):
+        """Restore unexpired entries saved by save(); a missing or corrupt file is ignored"""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return
+        now = time.time()
+        with self.lock:
+            for key, expires, value in entries:
+                if expires > now:
+                    self.data[key] = (expires, value)
+            while len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
@@ -0,0 +1,148 @@
+import collections  # For the bounded in-memory tail
+import threading  # For thread-safe appends
+import json  # For the on-disk record format
+import os  # For file handling
+
+# Append-only journal of chat messages shown on screen. Every message gets a
+# sequence number; consumers remember the last number they rendered and ask
+# only for newer entries, so an update costs O(new message) and messages that
+# arrive between two reads are never lost. History from earlier runs can be
+# attached behind the first entry and is exposed through sequence numbers <= 0.
+# A message that is still streaming in is rewritten in place with update();
+# its partial text stays in memory and only the final text is written.
+class ChatJournal:
+    def __init__(self, path=None, memory_limit=500):
+        self.lock = threading.RLock()
+        self.entries = collections.deque(maxlen=memory_limit)  # Recent (seq, text) pairs
+        self.offsets = []  # Byte offset of every record in the journal file, indexed by seq - 1
+        self.observers = []
+        self.update_observers = []
+        self.streaming = {}  # seq -> partial text not yet written to the file
+        self.last_seq = 0
+        self.path = path
+        self.size = 0
+        self.file = None
+        self.history = None
+        self.history_skip = 0
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self.file = open(path, "wb")  # One journal per run
+
+    def append(self, text):
+        """Add a message and return its sequence number"""
+        with self.lock:
+            self.last_seq += 1
+            seq = self.last_seq
+            self.entries.append((seq, text))
+            self.offsets.append(self.write(seq, text))
+            observers = list(self.observers)
+
+        self.notify(observers, seq)
+        return seq
+
+    def update(self, seq, text, final=False):
+        """Replace the text of an existing message, e.g. while its answer streams in
+
+        Pass final=True with the finished text; only then is a record written.
+        """
+        with self.lock:
+            if not 1 <= seq <= self.last_seq:
+                return
+            if self.entries and self.entries[0][0] <= seq:
+                self.entries[seq - self.entries[0][0]] = (seq, text)
+            if final:
+                self.streaming.pop(seq, None)
+                # The file stays append-only; the offset now points at the newer record.
+                self.offsets[seq - 1] = self.write(seq, text)
+            else:
+                self.streaming[seq] = text
+            observers = list(self.update_observers)
+
+        self.notify(observers, seq)
+
+    def write(self, seq, text):
+        """Append a record to the journal file and return its offset"""
+        if not self.file:
+            return None
+        record = (json.dumps({"seq": seq, "text": text}, ensure_ascii=False) + "\n").encode("utf-8")
+        offset = self.size
+        self.file.write(record)
+        self.file.flush()
+        self.size += len(record)
+        return offset
+
+    def notify(self, observers, seq):
+        for callback in observers:
+            try:
+                callback(seq)
+            except Exception as e:
+                print(f"ChatJournal observer error: {e}")
+
+    def subscribe(self, callback):
+        """Call callback(seq) after every append"""
+        with self.lock:
+            self.observers.append(callback)
+        return callback
+
+    def subscribe_updates(self, callback):
+        """Call callback(seq) after every update()"""
+        with self.lock:
+            self.update_observers.append(callback)
+        return callback
+
+    def attach_history(self, reader, skip):
+        """Expose older messages through seq <= 0
+
+        reader(start, count) returns messages counted back from a fixed end
+        (start=1 is the newest at attach time), newest first, so later
+        messages must not shift it; the first skip of them are already in
+        the journal as regular entries.
+        """
+        with self.lock:
+            self.history = reader
+            self.history_skip = skip
+
+    def read_since(self, seq, limit=None):
+        """Return entries newer than seq, oldest first, at most limit of them"""
+        with self.lock:
+            start = seq + 1
+            stop = self.last_seq + 1 if limit is None else min(self.last_seq + 1, start + limit)
+            older = self.read_history(start, min(stop, 1)) if start < 1 else []
+            start = max(start, 1)
+            if start >= stop:
+                return older
+            if self.entries and self.entries[0][0] <= start:
+                return older + [entry for entry in self.entries if start <= entry[0] < stop]
+            return older + self.read_range(start, stop)
+
+    def read_before(self, seq, count):
+        """Return up to count entries older than seq, oldest first"""
+        with self.lock:
+            start = seq - count
+            older = self.read_history(start, min(seq, 1)) if start < 1 else []
+            start = max(1, start)
+            if start >= seq:
+                return older
+            if self.entries and self.entries[0][0] <= start:
+                return older + [entry for entry in self.entries if start <= entry[0] < seq]
+            return older + self.read_range(start, seq)
+
+    def read_history(self, start, stop):
+        """Return attached history entries start <= seq < stop (all <= 0), oldest first"""
+        if not self.history or start >= stop:
+            return []
+        texts = self.history(self.history_skip + 2 - stop, stop - start)
+        return [(stop - 1 - i, text) for i, text in reversed(list(enumerate(texts)))]
+
+    def read_range(self, start, stop):
+        """Read entries start <= seq < stop back from the journal file"""
+        if not self.file or start >= stop:
+            return []
+        self.file.flush()
+        result = []
+        with open(self.path, "rb") as file:
+            for seq in range(start, min(stop, len(self.offsets) + 1)):
+                file.seek(self.offsets[seq - 1])  # Updated records are not in seq order
+                record = json.loads(file.readline())
+                result.append((record["seq"], self.streaming.get(seq, record["text"])))
+        return result
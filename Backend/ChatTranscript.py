@@ -0,0 +1,112 @@
+import threading  # For thread-safe appends
+import json  # For the one-message-per-line record format
+import os  # For file handling
+
+# Persisted, pre-formatted chat transcript used to paint the chat view at
+# startup. Each message is formatted once, when it is written, and stored as
+# one JSON line, so startup reads only the last few lines from the end of the
+# file and older lines are read backwards on demand as the user scrolls up.
+class ChatTranscript:
+    def __init__(self, path, formatter, block_size=8192):
+        self.path = path
+        self.formatter = formatter  # formatter(message) -> display text
+        self.block_size = block_size
+        self.lock = threading.Lock()
+        self.offsets = []  # Byte offsets of lines found so far, newest first
+        self.anchors = {}  # File size when a reader() was made -> its line offsets, newest first
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if not os.path.exists(path):
+            open(path, "wb").close()
+
+    def append(self, messages):
+        data = "".join(json.dumps(self.formatter(m), ensure_ascii=False) + "\n" for m in messages)
+        with self.lock:
+            with open(self.path, "ab") as f:
+                f.write(data.encode("utf-8"))
+            self.offsets = []  # Line positions shifted relative to the end
+
+    def rebuild(self, messages):
+        """Rewrite the whole transcript; only needed when it is missing or out of sync"""
+        temp_path = self.path + ".tmp"
+        with self.lock:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                for message in messages:
+                    f.write(json.dumps(self.formatter(message), ensure_ascii=False) + "\n")
+            os.replace(temp_path, self.path)
+            self.offsets = []
+            self.anchors = {}
+
+    def clear(self):
+        with self.lock:
+            open(self.path, "wb").close()
+            self.offsets = []
+            self.anchors = {}
+
+    def on_change(self, op, messages):
+        """Conversation store observer keeping the transcript in step with the log"""
+        if op == "extend":
+            self.append(messages)
+        elif op == "clear":
+            self.clear()
+
+    def matches(self, message):
+        """True when the newest transcript line is the formatted message (or both are empty)"""
+        last = self.read_back(1, 1)
+        if message is None:
+            return not last
+        return last == [self.formatter(message)]
+
+    def tail(self, count):
+        """Return the last count formatted messages, oldest first"""
+        return list(reversed(self.read_back(1, count)))
+
+    def reader(self):
+        """read_back counted from the current end; messages appended later do not shift it"""
+        with self.lock:
+            end = os.path.getsize(self.path)
+            self.anchors.setdefault(end, [])
+        return lambda start, count: self.read_back(start, count, end)
+
+    def read_back(self, start, count, end=None):
+        """Return formatted messages start..start+count-1 counted back from end (1 = newest), newest first
+
+        end is a file size from reader(); None means the current end of the file.
+        """
+        with self.lock:
+            offsets = self.offsets if end is None else self.anchors.get(end)
+            if offsets is None:
+                return []  # The transcript was rebuilt or cleared since the reader was made
+            with open(self.path, "rb") as f:
+                self.index_back(f, start + count - 1, offsets, end)
+                result = []
+                for offset in offsets[start - 1:start - 1 + count]:
+                    f.seek(offset)
+                    result.append(json.loads(f.readline()))
+                return result
+
+    def index_back(self, f, count, offsets, size=None):
+        """Scan backwards from the oldest known line until count line offsets are known"""
+        if size is None:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+        position = offsets[-1] if offsets else size
+        if position == 0:
+            return  # Empty file or already back at the first line
+        position -= 1  # Skip the newline that ends the line before position
+        buffer = b""
+        while len(offsets) < count and position > 0:
+            read_size = min(self.block_size, position)
+            position -= read_size
+            f.seek(position)
+            buffer = f.read(read_size) + buffer
+            # Every newline in the buffer ends the line before the one that starts after it.
+            end = len(buffer)
+            while len(offsets) < count:
+                newline = buffer.rfind(b"\n", 0, end)
+                if newline < 0:
+                    break
+                offsets.append(position + newline + 1)
+                end = newline
+            buffer = buffer[:end]
+        if len(offsets) < count and position == 0 and buffer:
+            offsets.append(0)  # First line of the file
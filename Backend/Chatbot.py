@@ -1,21 +1,18 @@
-from groq import Groq  # type: ignore
-from json import load, dump
+import itertools
+import atexit
+import os
 import datetime
 from dotenv import dotenv_values
+from Backend.ConversationStore import Conversation
+from Backend.ContextBuilder import ContextBuilder
+from Backend.Resilience import Policy
+from Backend.ResponseCache import ResponseCache
+from Backend import LLM
 
 # Load environment variables
 env_vars = dotenv_values(".env")
 Username = env_vars.get("Username")
 Assistantname = env_vars.get("Assistantname")
-GroqAPIKey = env_vars.get("GroqAPIKey") or "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"
-
-# Check API key
-if not GroqAPIKey:
-    print("Error: Groq API key not found in .env file")
-    exit(1)
-
-# Initialize Groq client
-client = Groq(api_key=GroqAPIKey)
 
 # System prompt
 System = (
@@ -28,14 +25,34 @@ System = (
 
 SystemChatBot = [{"role": "system", "content": System}]
 
-# Load existing chat log
-try:
-    with open(r"Data\ChatLog.json", "r") as f:
-        messages = load(f)
-except FileNotFoundError:
-    with open(r"Data\ChatLog.json", "w") as f:
-        dump([], f)
-    messages = []
+# Retries, deadline and optional hedging for the time to the first token.
+ChatPolicy = Policy("chatbot", attempts=3, deadline=float(env_vars.get("ChatDeadline", 30)))
+FallbackAnswer = "Sorry, I couldn't reach the language model just now. Please try again."
+
+# Own rolling summary; the search engine reserves a different window.
+Context = ContextBuilder()
+
+# Opt-in answer cache (ResponseCache=True) for repeated general questions.
+# Time-sensitive and follow-up questions always go to the model; answers are
+# kept for ResponseCacheDays and saved to Data/ResponseCache.json.
+ResponseCacheEnabled = str(env_vars.get("ResponseCache", "False")).lower() == "true"
+ResponseCachePath = os.path.join("Data", "ResponseCache.json")
+Responses = ResponseCache(
+    maxsize=int(env_vars.get("ResponseCacheSize", 500)),
+    ttl=float(env_vars.get("ResponseCacheDays", 7)) * 24 * 60 * 60,
+    threshold=float(env_vars.get("ResponseCacheThreshold", 0.92))
+) if ResponseCacheEnabled else None
+
+def SaveResponseCache():
+    try:
+        os.makedirs("Data", exist_ok=True)
+        Responses.save(ResponseCachePath)
+    except OSError as e:
+        print(f"Response cache not saved: {e}")
+
+if Responses:
+    Responses.load(ResponseCachePath)
+    atexit.register(SaveResponseCache)
 
 # Real-time info function
 def RealtimeInformation():
@@ -53,42 +70,46 @@ def RealtimeInformation():
 def AnswerModifier(answer):
     return "\n".join(line for line in answer.split('\n') if line.strip())
 
-# Chatbot core function
-def ChatBot(query):  
+# Streaming chatbot: yields the answer piece by piece as tokens arrive. The
+# turn is saved to the history once the stream has been read to the end.
+def ChatBotStream(query):
+    cached = Responses.get(query) if Responses else None
+    if cached is not None:
+        # Still recorded as a turn so later follow-ups have their context
+        Conversation.extend([{"role": "user", "content": query}, {"role": "assistant", "content": cached}])
+        yield cached
+        return
+
+    # Recent history comes from the shared in-memory cache
+    messages = Conversation.tail()
+    messages.append({"role": "user", "content": query})
+    prompt = Context.build(SystemChatBot + [{"role": "system", "content": RealtimeInformation()}], messages, reserve=1024)
+
+    answer = ""
+    complete = False
     try:
-        with open(r"Data\ChatLog.json", "r") as f:
-            messages = load(f)
-
-        messages.append({"role": "user", "content": query})
-
-        completion = client.chat.completions.create(
-            model="llama3-70b-8192",
-            messages=SystemChatBot + [{"role": "system", "content": RealtimeInformation()}] + messages,
-            max_tokens=1024,
-            temperature=0.7,
-            top_p=1,
-            stream=True,
-            stop=None
-        )
-
-        answer = ""
-        for chunk in completion:
-            if chunk.choices[0].delta.content:
-                answer += chunk.choices[0].delta.content
-
-        answer = answer.replace("</s>", "")
-        messages.append({"role": "assistant", "content": answer})
+        first, completion = ChatPolicy.stream(lambda timeout: LLM.Stream("chat", prompt, timeout))
+        for text in itertools.chain([first], completion):
+            answer += text
+            yield text
+        complete = True
+    except Exception as e:
+        # History is never wiped; a turn with no answer at all is not recorded.
+        print(f"Error: {e}")
+        if not answer:
+            yield FallbackAnswer
+            return
 
-        with open(r"Data\ChatLog.json", "w") as f:
-            dump(messages, f, indent=4)
+    answer = answer.replace("</s>", "")
 
-        return AnswerModifier(answer)
+    # Two appends per turn, whatever the history length
+    Conversation.extend([{"role": "user", "content": query}, {"role": "assistant", "content": answer}])
+    if Responses and complete:
+        Responses.put(query, answer)
 
-    except Exception as e:
-        print(f"Error: {e}")
-        with open(r"Data\ChatLog.json", "w") as f:
-            dump([], f, indent=4)
-        return ChatBot(query)
+# Chatbot core function
+def ChatBot(query):
+    return AnswerModifier("".join(ChatBotStream(query)).replace("</s>", ""))
 
 # CLI Interface
 if __name__ == "__main__":
@@ -98,5 +119,7 @@ if __name__ == "__main__":
             print("Maverick:", ChatBot(user_input))
     except KeyboardInterrupt:
         print("\nChatbot session ended.")
+        if Responses:
+            print(f"Response cache: {Responses.stats()}")
     except Exception as e:
         print(f"Error: {e}")
@@ -0,0 +1,93 @@
+import threading  # For guarding the shared summary cache
+import re  # For the local token estimate and sentence splitting
+from dotenv import dotenv_values  # For reading the budget from .env
+
+env_vars = dotenv_values(".env")
+ContextTokenBudget = int(env_vars.get("ContextTokenBudget", 8192))  # Context window of llama3-70b-8192
+ContextSummary = str(env_vars.get("ContextSummary", "True")).lower() != "false"
+
+TokenPattern = re.compile(r"\w+|[^\w\s]")
+MessageOverhead = 4  # Role and separator tokens added per chat message
+
+def EstimateTokens(text):
+    """Cheap local token estimate; long words count as several BPE pieces"""
+    return sum(1 + len(piece) // 7 for piece in TokenPattern.findall(text))
+
+def MessageTokens(message):
+    return EstimateTokens(message["content"]) + MessageOverhead
+
+# Keeps each prompt inside the model's context window: system messages are
+# always sent, then as many of the most recent turns as the budget allows.
+# Turns that fall off the front are folded into a short rolling summary which
+# is cached and only extended with newly dropped turns. Folding is one-way: a
+# summarized turn is never sent again, even if a later window would fit it.
+# Each caller with its own reserve should have its own builder.
+class ContextBuilder:
+    def __init__(self, budget=ContextTokenBudget, summarize=ContextSummary, summary_tokens=300, summarizer=None):
+        self.budget = budget
+        self.summarize = summarize
+        self.summary_tokens = summary_tokens
+        self.summarizer = summarizer or self.local_summary  # summarizer(previous_summary, new_messages) -> str
+        self.lock = threading.Lock()
+        self.summary = ""
+        self.folded = set()  # Fingerprints of the messages already in the summary, never removed while in the history
+
+    def build(self, system_messages, history, reserve=0):
+        """Return system_messages + summary + recent history within budget - reserve tokens"""
+        available = self.budget - reserve - sum(MessageTokens(m) for m in system_messages)
+
+        kept = []
+        used = 0
+        for message in reversed(history):
+            cost = MessageTokens(message)
+            if kept and used + cost > available:
+                break
+            kept.append(message)
+            used += cost
+        kept.reverse()
+
+        older = history[:len(history) - len(kept)]
+        with self.lock:
+            folded = set(self.folded) if self.summarize else set()
+        # Turns already in the summary stay there.
+        while len(kept) > 1 and self.fingerprint(kept[0]) in folded:
+            older = older + [kept.pop(0)]
+        # Never start the window with an orphaned assistant reply.
+        while len(kept) > 1 and kept[0]["role"] == "assistant":
+            older = older + [kept.pop(0)]
+
+        if not older or not self.summarize:
+            return system_messages + kept
+
+        summary = {"role": "system", "content": "Summary of the earlier conversation:\n" + self.rolling_summary(older, history)}
+        used += MessageTokens(summary)
+        while len(kept) > 1 and (used > available or kept[0]["role"] == "assistant"):
+            used -= MessageTokens(kept.pop(0))
+        return system_messages + [summary] + kept
+
+    @staticmethod
+    def fingerprint(message):
+        return hash((message["role"], message["content"]))
+
+    def rolling_summary(self, older, history):
+        """Summary of older, folding in only messages that were not summarized before"""
+        with self.lock:
+            new_messages = [m for m in older if self.fingerprint(m) not in self.folded]
+            if new_messages:
+                self.summary = self.summarizer(self.summary, new_messages)
+            # Only turns that slid out of the history are forgotten; they never come back.
+            self.folded = (self.folded | {self.fingerprint(m) for m in new_messages}) & {self.fingerprint(m) for m in history}
+            return self.summary
+
+    def local_summary(self, summary, messages):
+        """Append the first sentence of each message, dropping the oldest lines past summary_tokens"""
+        lines = summary.split("\n") if summary else []
+        for message in messages:
+            first = re.split(r"(?<=[.!?])\s", message["content"].strip(), maxsplit=1)[0]
+            words = first.split()
+            if len(words) > 25:
+                first = " ".join(words[:25]) + " ..."
+            lines.append(f"{message['role']}: {first}")
+        while len(lines) > 1 and EstimateTokens("\n".join(lines)) > self.summary_tokens:
+            lines.pop(0)
+        return "\n".join(lines)
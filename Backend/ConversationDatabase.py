@@ -0,0 +1,131 @@
+import threading  # For serializing access to the shared connection
+import sqlite3  # For the on-disk conversation database
+import time  # For message timestamps
+import uuid  # For per-run session ids
+import os  # For file handling
+
+# SQLite conversation history. Same interface as ConversationStore, so the
+# backends can use either one, plus indexed queries that do not need the
+# whole history in memory: last N turns, full-text matches and turns since a
+# timestamp. Runs in WAL mode so readers never block the writer.
+class SQLiteConversationStore:
+    def __init__(self, path=os.path.join("Data", "ChatLog.db"), tail_size=200):
+        self.path = path
+        self.tail_size = tail_size
+        self.session = uuid.uuid4().hex  # One session id per run
+        self.lock = threading.RLock()
+        self.observers = []
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS messages ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, session TEXT NOT NULL, "
+            "role TEXT NOT NULL, content TEXT NOT NULL, ts REAL NOT NULL)"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS messages_ts ON messages(ts)")
+        self.fts = self.setup_fts()
+        self.db.commit()
+        self.count = self.db.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+        if self.count == 0:
+            self.migrate()
+
+    def setup_fts(self):
+        """Create the FTS5 index and its sync triggers; falls back to LIKE when FTS5 is missing"""
+        try:
+            self.db.execute("CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(content, content='messages', content_rowid='id')")
+        except sqlite3.OperationalError:
+            return False
+        self.db.executescript(
+            "CREATE TRIGGER IF NOT EXISTS messages_ai AFTER INSERT ON messages BEGIN "
+            "INSERT INTO messages_fts(rowid, content) VALUES (new.id, new.content); END;"
+            "CREATE TRIGGER IF NOT EXISTS messages_ad AFTER DELETE ON messages BEGIN "
+            "INSERT INTO messages_fts(messages_fts, rowid, content) VALUES ('delete', old.id, old.content); END;"
+        )
+        return True
+
+    def migrate(self):
+        """Import the JSONL / JSON chat log the first time the database is created"""
+        from Backend.ConversationStore import ConversationStore
+        legacy = os.path.join("Data", "ChatLog.jsonl")
+        if os.path.exists(legacy) or os.path.exists(os.path.join("Data", "ChatLog.json")):
+            messages = ConversationStore(path=legacy).all()
+            if messages:
+                self.extend(messages, session="imported")
+
+    def extend(self, messages, session=None):
+        now = time.time()
+        rows = [(session or self.session, m["role"], m["content"], now) for m in messages]
+        with self.lock:
+            self.db.executemany("INSERT INTO messages (session, role, content, ts) VALUES (?, ?, ?, ?)", rows)
+            self.db.commit()
+            self.count += len(rows)
+            self.notify("extend", messages)
+
+    def append(self, role, content):
+        self.extend([{"role": role, "content": content}])
+
+    def clear(self):
+        with self.lock:
+            self.db.execute("DELETE FROM messages")
+            self.db.commit()
+            self.count = 0
+            self.notify("clear")
+
+    def subscribe(self, callback):
+        """Call callback(op, messages) after each write ("extend" or "clear" op)"""
+        self.observers.append(callback)
+        return callback
+
+    def notify(self, op, messages=None):
+        for callback in list(self.observers):
+            try:
+                callback(op, messages)
+            except Exception as e:
+                print(f"Conversation observer error: {e}")
+
+    def query(self, sql, params=()):
+        with self.lock:
+            rows = self.db.execute(sql, params).fetchall()
+        return [{"role": role, "content": content, "ts": ts, "session": session} for role, content, ts, session in rows]
+
+    def tail(self, n=None):
+        """Return the last n messages (tail_size when n is None) as role/content dicts"""
+        n = self.tail_size if n is None else n
+        if n <= 0:
+            return []
+        rows = self.query("SELECT role, content, ts, session FROM messages ORDER BY id DESC LIMIT ?", (n,))
+        return [{"role": r["role"], "content": r["content"]} for r in reversed(rows)]
+
+    def last_turns(self, n):
+        """Return the last n user/assistant turns"""
+        return self.tail(2 * n)
+
+    def search(self, text, limit=20):
+        """Return messages matching text, best match first"""
+        if self.fts:
+            terms = " ".join('"' + word.replace('"', '""') + '"' for word in text.split())
+            if not terms:
+                return []
+            return self.query(
+                "SELECT m.role, m.content, m.ts, m.session FROM messages_fts f JOIN messages m ON m.id = f.rowid "
+                "WHERE messages_fts MATCH ? ORDER BY f.rank LIMIT ?", (terms, limit))
+        return self.query("SELECT role, content, ts, session FROM messages WHERE content LIKE ? ORDER BY id DESC LIMIT ?", (f"%{text}%", limit))
+
+    def since(self, timestamp, limit=None):
+        """Return messages stored at or after timestamp, oldest first"""
+        return self.query("SELECT role, content, ts, session FROM messages WHERE ts >= ? ORDER BY id LIMIT ?", (timestamp, -1 if limit is None else limit))
+
+    def session_messages(self, session=None):
+        """Return every message of a session (the current run by default)"""
+        return self.query("SELECT role, content, ts, session FROM messages WHERE session = ? ORDER BY id", (session or self.session,))
+
+    def all(self):
+        return [{"role": r["role"], "content": r["content"]} for r in self.query("SELECT role, content, ts, session FROM messages ORDER BY id")]
+
+    def flush(self):
+        """Writes are synchronous; nothing is ever pending"""
+
+    def __len__(self):
+        return self.count
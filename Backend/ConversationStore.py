@@ -0,0 +1,258 @@
+import collections  # For the in-memory tail cache
+import threading  # For thread-safe appends and the write-behind thread
+import atexit  # For flushing pending writes on exit
+import queue  # For handing writes to the background thread
+import json  # For the JSONL record format
+import time  # For message timestamps
+import os  # For file handling
+from dotenv import dotenv_values  # For reading the cache size from .env
+
+env_vars = dotenv_values(".env")
+ChatHistoryCache = int(env_vars.get("ChatHistoryCache", 200))  # Messages kept in memory and sent as history
+ChatStorage = str(env_vars.get("ChatStorage", "jsonl")).lower()  # "jsonl" or "sqlite"
+ChatWriteBehind = str(env_vars.get("ChatWriteBehind", "True")).lower() != "false"
+
+# Append-only conversation log shared by ChatBot, RealtimeSearchEngine and
+# Main.py. Each message is one JSON line, so a turn costs two small appends
+# instead of re-parsing and re-writing the whole ChatLog.json. Clearing the
+# log appends a marker; compaction later rewrites the file without the dead
+# records and any torn trailing line.
+class ConversationStore:
+    def __init__(self, path=os.path.join("Data", "ChatLog.jsonl"), legacy_path=os.path.join("Data", "ChatLog.json"), tail_size=ChatHistoryCache, compact_after=1000):
+        self.path = path
+        self.lock = threading.RLock()
+        self.cache = collections.deque(maxlen=tail_size)  # Most recent live messages
+        self.count = 0  # Live messages (after the last clear)
+        self.dead = 0  # Records that compaction would drop
+        self.compact_after = compact_after
+        self.observers = []
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+        if not os.path.exists(path):
+            self.migrate(legacy_path)
+        self.load()
+        if self.dead:
+            self.compact()
+
+    def migrate(self, legacy_path):
+        """Convert an existing ChatLog.json array into the JSONL log once"""
+        messages = []
+        try:
+            with open(legacy_path, "r", encoding="utf-8") as f:
+                messages = json.load(f)
+        except (OSError, ValueError):
+            pass
+        with open(self.path, "w", encoding="utf-8") as f:
+            for message in messages:
+                f.write(json.dumps({"role": message["role"], "content": message["content"]}, ensure_ascii=False) + "\n")
+
+    def load(self):
+        """Scan the log once to rebuild the tail cache and counters"""
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    self.dead += 1  # Torn write from a crash
+                    continue
+                if record.get("op") == "clear":
+                    self.dead += self.count + 1
+                    self.count = 0
+                    self.cache.clear()
+                else:
+                    self.count += 1
+                    self.cache.append(record)
+
+    def write(self, records):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records))
+
+    def append(self, role, content):
+        """Append one message; disk cost is independent of history length"""
+        self.extend([{"role": role, "content": content}])
+
+    def extend(self, messages):
+        records = [{"role": m["role"], "content": m["content"], "ts": time.time()} for m in messages]
+        with self.lock:
+            self.write(records)
+            self.cache.extend(records)
+            self.count += len(records)
+            self.notify("extend", messages)
+
+    def clear(self):
+        with self.lock:
+            self.write([{"op": "clear", "ts": time.time()}])
+            self.dead += self.count + 1
+            self.count = 0
+            self.cache.clear()
+            if self.dead >= self.compact_after:
+                self.compact()
+            self.notify("clear")
+
+    def subscribe(self, callback):
+        """Call callback(op, messages) after each write ("extend" or "clear" op)"""
+        self.observers.append(callback)
+        return callback
+
+    def notify(self, op, messages=None):
+        for callback in list(self.observers):
+            try:
+                callback(op, messages)
+            except Exception as e:
+                print(f"Conversation observer error: {e}")
+
+    def tail(self, n=None):
+        """Return the last n cached messages (all cached when n is None) as role/content dicts"""
+        with self.lock:
+            records = list(self.cache)
+        if n is not None:
+            records = records[-n:] if n > 0 else []
+        return [{"role": r["role"], "content": r["content"]} for r in records]
+
+    def last_turns(self, n):
+        """Return the last n user/assistant turns"""
+        return self.tail(2 * n)
+
+    def all(self):
+        """Read the full live history from disk; only for rare, non-latency-critical callers"""
+        messages = []
+        with self.lock:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    if record.get("op") == "clear":
+                        messages = []
+                    else:
+                        messages.append({"role": record["role"], "content": record["content"]})
+        return messages
+
+    def compact(self):
+        """Rewrite the log with only live records, atomically replacing the old file"""
+        with self.lock:
+            live = []
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    if record.get("op") == "clear":
+                        live = []
+                    else:
+                        live.append(line if line.endswith("\n") else line + "\n")
+            temp_path = self.path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                f.writelines(live)
+            os.replace(temp_path, self.path)
+            self.dead = 0
+
+    def flush(self):
+        """Writes are synchronous; nothing is ever pending"""
+
+    def __len__(self):
+        return self.count
+
+# Write-behind cache in front of a store. The history is loaded once; reads are
+# served from memory and writes are applied to memory immediately, then
+# handed to a single background thread that persists them in batches. Answers
+# never wait for disk, there is exactly one writer, and pending writes are
+# flushed when the process exits.
+class WriteBehindConversation:
+    def __init__(self, store, tail_size=ChatHistoryCache):
+        self.store = store
+        self.lock = threading.Lock()
+        self.cache = collections.deque(store.tail(tail_size), maxlen=tail_size)
+        self.count = len(store)
+        self.pending = queue.Queue()
+        self.writer = threading.Thread(target=self.write_loop, name="ConversationWriter", daemon=True)
+        self.writer.start()
+        atexit.register(self.flush)
+
+    def write_loop(self):
+        while True:
+            batch = [self.pending.get()]
+            while True:  # Coalesce everything queued so far into one write
+                try:
+                    batch.append(self.pending.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self.apply(batch)
+            except Exception as e:
+                print(f"Conversation write error: {e}")
+            finally:
+                for _ in batch:
+                    self.pending.task_done()
+
+    def apply(self, batch):
+        messages = []
+        for op, payload in batch:
+            if op == "extend":
+                messages.extend(payload)
+                continue
+            if messages:
+                self.store.extend(messages)
+                messages = []
+            self.store.clear()
+        if messages:
+            self.store.extend(messages)
+
+    def append(self, role, content):
+        self.extend([{"role": role, "content": content}])
+
+    def extend(self, messages):
+        messages = [{"role": m["role"], "content": m["content"]} for m in messages]
+        with self.lock:
+            self.cache.extend(messages)
+            self.count += len(messages)
+            self.pending.put(("extend", messages))
+
+    def clear(self):
+        with self.lock:
+            self.cache.clear()
+            self.count = 0
+            self.pending.put(("clear", None))
+
+    def tail(self, n=None):
+        with self.lock:
+            messages = list(self.cache)
+        if n is not None:
+            messages = messages[-n:] if n > 0 else []
+        return [dict(m) for m in messages]
+
+    def last_turns(self, n):
+        return self.tail(2 * n)
+
+    def all(self):
+        """Full history; from memory when it fits in the cache, otherwise from the flushed store"""
+        with self.lock:
+            if self.count <= len(self.cache):
+                return [dict(m) for m in self.cache]
+        self.flush()
+        return self.store.all()
+
+    def flush(self):
+        """Block until every queued write has reached the store"""
+        self.pending.join()
+
+    def __getattr__(self, name):
+        # Backend-specific queries (search, since, ...) see all writes so far.
+        attribute = getattr(self.store, name)
+        if callable(attribute):
+            self.flush()
+        return attribute
+
+    def __len__(self):
+        return self.count
+
+# Process-wide store used by every backend.
+if ChatStorage == "sqlite":
+    from Backend.ConversationDatabase import SQLiteConversationStore
+    Conversation = SQLiteConversationStore(tail_size=ChatHistoryCache)
+else:
+    Conversation = ConversationStore()
+if ChatWriteBehind:
+    Conversation = WriteBehindConversation(Conversation)
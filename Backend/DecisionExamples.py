@@ -0,0 +1,26 @@
+# Decision categories and the example conversation shared by the decision
+# model and the offline classifier. Kept free of imports so the classifier
+# can be trained without API keys or network clients.
+
+#Define the list of functions that the model can perform.
+funcs = [
+    "exit", "general", "realtime", "open", "close", "play",
+    "generate image", "system", "content", "google search",
+    "youtube search", "reminder"
+]
+
+# Fixed ChatHistory roles (changed to lowercase)
+ChatHistory = [
+    {"role": "user", "message": "how are you?"},  # Changed from "User"
+    {"role": "chatbot", "message": "general how are you?"},  # Changed from "Chatbot"
+    {"role": "user", "message": "do you like pizza?"},
+    {"role": "chatbot", "message": "general do you like pizza?"},
+    {"role": "user", "message": "open chrome and tell me about mahatma gandhi."},
+    {"role": "chatbot", "message": "open chrome, general tell me about mahatma gandhi."},
+    {"role": "user", "message": "open chrome and firefox"},
+    {"role": "chatbot", "message": "open chrome, open firefox"},
+    {"role": "user", "message": "what is today's date and by the way remind me that i have a dancing performance on 5th Aug at 11:00pm"},
+    {"role": "chatbot", "message": "general what is today's date, reminder 11:00pm 5th aug dancing performance"},
+    {"role": "user", "message": "chat with me."},
+    {"role": "chatbot", "message": "general chat with me."}
+]
@@ -0,0 +1,92 @@
+from concurrent.futures import ThreadPoolExecutor  # For running branches in parallel
+import threading  # For branch completion events
+import queue  # For buffering answer pieces
+import time  # For branch latency
+
+# One task of a decision ("open chrome", "realtime today's news"). Answer
+# branches buffer their text pieces so they can be shown in decision order
+# while they are all being generated at the same time.
+class Branch:
+    def __init__(self, index, task, answers):
+        self.index = index
+        self.task = task
+        self.answers = answers  # True when the handler yields answer text
+        self.started = time.perf_counter()
+        self.first_piece = None  # Seconds to the first answer piece
+        self.latency = None
+        self.error = None
+        self.pieces = queue.Queue()
+        self.done = threading.Event()
+
+    def stream(self):
+        """Yield the answer pieces, waiting for the branch as needed"""
+        return iter(self.pieces.get, None)
+
+    def finish(self):
+        self.latency = time.perf_counter() - self.started
+        self.pieces.put(None)
+        self.done.set()
+
+# Fans out every task of a decision as soon as it is decided. handlers is a
+# list of (prefix, handler, answers): handler(task) runs on a worker thread
+# and, for answer handlers, returns an iterable of text pieces. An answer
+# branch that fails before its first piece yields fallback instead.
+class DecisionExecutor:
+    def __init__(self, handlers, max_workers=8, fallback=None):
+        self.handlers = handlers
+        self.fallback = fallback
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="Decision")
+
+    def lookup(self, task):
+        return next(((handler, answers) for prefix, handler, answers in self.handlers if task.startswith(prefix)), (None, False))
+
+    def run(self):
+        return DecisionRun(self)
+
+class DecisionRun:
+    def __init__(self, executor):
+        self.executor = executor
+        self.started = time.perf_counter()
+        self.branches = []
+
+    def submit(self, task, handler=None):
+        """Start a task now; handler overrides the executor's handler for its prefix"""
+        default, answers = self.executor.lookup(task)
+        handler = handler or default
+        branch = Branch(len(self.branches), task, answers)
+        self.branches.append(branch)
+        if handler is None:
+            branch.finish()  # Nothing handles this kind of task
+        else:
+            self.executor.pool.submit(self.execute, branch, handler)
+        return branch
+
+    def execute(self, branch, handler):
+        try:
+            result = handler(branch.task)
+            if branch.answers and result is not None:
+                for piece in result:
+                    if branch.first_piece is None:
+                        branch.first_piece = time.perf_counter() - branch.started
+                    branch.pieces.put(piece)
+        except Exception as e:
+            branch.error = e
+            print(f"Error in '{branch.task}': {e}")
+            if branch.answers and branch.first_piece is None and self.executor.fallback:
+                branch.pieces.put(self.executor.fallback)
+        finally:
+            branch.finish()
+
+    def answers(self):
+        """Answer branches in decision order"""
+        return [branch for branch in self.branches if branch.answers]
+
+    def report(self):
+        """Per-branch latency in ms (None while still running) plus the run's wall time"""
+        branches = [{
+            "task": branch.task,
+            "latency_ms": None if branch.latency is None else round(branch.latency * 1000),
+            "first_piece_ms": None if branch.first_piece is None else round(branch.first_piece * 1000),
+            "error": str(branch.error) if branch.error else None,
+        } for branch in self.branches]
+        return {"wall_ms": round((time.perf_counter() - self.started) * 1000), "branches": branches}
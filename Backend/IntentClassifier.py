@@ -0,0 +1,142 @@
+import argparse  # For the train/evaluate command line
+import random  # For the evaluation split
+import json  # For reading the decision log
+import time  # For latency measurement
+import zlib  # For stable feature hashing
+import os  # For file handling
+
+try:
+    import numpy as np  # Optional: the classifier is disabled without NumPy
+except ImportError:
+    np = None
+
+ModelPath = os.path.join("Data", "IntentClassifier.npz")
+DecisionLogPath = os.path.join("Data", "DecisionLog.jsonl")
+
+# Offline decision-category classifier. Queries are turned into hashed
+# character n-gram and word features; each category is the normalized
+# centroid of its training examples, so prediction is one sparse dot product
+# per category. It needs no GPU and no network and keeps the assistant working
+# when the Cohere API is slow or down.
+class IntentClassifier:
+    def __init__(self, dim=1 << 14, ngrams=(2, 3, 4)):
+        self.dim = dim
+        self.ngrams = ngrams
+        self.labels = []
+        self.weights = None  # (len(labels), dim) float32
+
+    def features(self, text):
+        """Hashed feature indices and counts for text"""
+        text = " ".join(text.lower().split())
+        padded = f" {text} "
+        grams = [padded[i:i + n] for n in self.ngrams for i in range(len(padded) - n + 1)]
+        grams += ["w:" + word for word in text.split()]
+        indices = np.fromiter((zlib.crc32(g.encode("utf-8")) % self.dim for g in grams), dtype=np.int64, count=len(grams))
+        return np.unique(indices, return_counts=True)
+
+    def vector(self, text):
+        indices, counts = self.features(text)
+        values = np.sqrt(counts.astype(np.float32))
+        return indices, values / (np.linalg.norm(values) or 1.0)
+
+    def fit(self, examples):
+        """Train from (query, category) pairs"""
+        self.labels = sorted({label for _, label in examples})
+        position = {label: i for i, label in enumerate(self.labels)}
+        weights = np.zeros((len(self.labels), self.dim), dtype=np.float32)
+        for query, label in examples:
+            indices, values = self.vector(query)
+            np.add.at(weights[position[label]], indices, values)
+        norms = np.linalg.norm(weights, axis=1, keepdims=True)
+        self.weights = weights / np.where(norms == 0, 1.0, norms)
+        return self
+
+    def scores(self, query):
+        indices, values = self.vector(query)
+        return self.weights[:, indices] @ values
+
+    def predict(self, query):
+        """Return (category, margin) where margin is the cosine gap to the runner-up"""
+        scores = self.scores(query)
+        order = np.argsort(scores)[::-1]
+        runner_up = float(scores[order[1]]) if len(order) > 1 else 0.0
+        return self.labels[order[0]], float(scores[order[0]]) - runner_up
+
+    def save(self, path=ModelPath):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        np.savez_compressed(path, weights=self.weights, labels=np.array(self.labels), dim=self.dim, ngrams=np.array(self.ngrams))
+
+    @classmethod
+    def load(cls, path=ModelPath):
+        """Load a trained model, or return None when NumPy or the model file is missing"""
+        if np is None or not os.path.exists(path):
+            return None
+        data = np.load(path)
+        model = cls(dim=int(data["dim"]), ngrams=tuple(int(n) for n in data["ngrams"]))
+        model.weights = data["weights"]
+        model.labels = [str(label) for label in data["labels"]]
+        return model
+
+def Category(decision, funcs):
+    """Function name that a decided task starts with"""
+    return next((func for func in funcs if decision.startswith(func)), None)
+
+def SingleCategory(tasks, funcs):
+    """The category shared by every task, or None for mixed or unknown decisions"""
+    categories = {Category(task.strip(), funcs) for task in tasks}
+    return categories.pop() if len(categories) == 1 else None
+
+def TrainingExamples(chat_history, funcs, log_path=DecisionLogPath):
+    """Few-shot pairs from the DMM prompt plus the logged decisions, skipping mixed-intent ones"""
+    examples = []
+    for user, bot in zip(chat_history[::2], chat_history[1::2]):
+        category = SingleCategory(bot["message"].split(","), funcs)
+        if category:
+            examples.append((user["message"], category))
+    try:
+        with open(log_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                category = SingleCategory(record["decision"], funcs)
+                if category:
+                    examples.append((record["query"], category))
+    except OSError:
+        pass
+    return examples
+
+def Evaluate(examples, holdout=0.2, seed=0):
+    """Train on a random split and report accuracy and per-query latency on the rest"""
+    examples = list(examples)
+    if not examples:
+        raise ValueError("no training examples")
+    random.Random(seed).shuffle(examples)
+    cut = max(1, int(len(examples) * (1 - holdout)))
+    train, test = examples[:cut], examples[cut:] or examples[:cut]
+    model = IntentClassifier().fit(train)
+    start = time.perf_counter()
+    predictions = [model.predict(query)[0] for query, _ in test]
+    latency = (time.perf_counter() - start) / len(test)
+    correct = sum(p == label for p, (_, label) in zip(predictions, test))
+    return {"train": len(train), "test": len(test), "accuracy": correct / len(test), "latency_ms": latency * 1000}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train or evaluate the offline DMM intent classifier.")
+    parser.add_argument("command", choices=["train", "evaluate"])
+    parser.add_argument("--log", default=DecisionLogPath, help="decision log collected from FirstLayerDMM")
+    parser.add_argument("--model", default=ModelPath, help="where to save the trained model")
+    args = parser.parse_args()
+
+    if np is None:
+        raise SystemExit("NumPy is required for the offline intent classifier (pip install numpy).")
+    from Backend.DecisionExamples import ChatHistory, funcs
+    examples = TrainingExamples(ChatHistory, funcs, args.log)
+    if not examples:
+        raise SystemExit("No training examples found.")
+    if args.command == "train":
+        IntentClassifier().fit(examples).save(args.model)
+        print(f"Trained on {len(examples)} examples, saved to {args.model}")
+    else:
+        print(Evaluate(examples))
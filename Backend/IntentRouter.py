@@ -0,0 +1,76 @@
+import threading  # For thread-safe counters
+import re  # For the compiled command patterns
+
+# Local fast path in front of the Cohere decision model. Plain imperative
+# commands ("open chrome", "volume up", "play let her go") are matched against
+# compiled patterns and decided in microseconds; anything that does not match
+# with high confidence returns None so the caller falls back to the model.
+
+Politeness = re.compile(r"^(?:(?:hey |ok |okay )?(?:jarvis|maverick)[, ]+)?(?:(?:can|could|would|will) you (?:please )?|please )?")
+Trailing = re.compile(r"(?:[\s,]+please)?[\s.!?]*$")
+Splitter = re.compile(r"\s*(?:,|\band\b|&)\s*")
+# Words that mean a fragment is a question or another kind of task, not an app name.
+NotATarget = re.compile(r"\b(?:what|who|when|where|why|how|which|tell|about|search|play|write|generate|remind|news|weather|and)\b")
+# A separator followed by another command means "play x" is really several tasks.
+AnotherCommand = re.compile(r"(?:,|\band\b|&)\s*(?:then |also )?(?:open|launch|start|close|quit|exit|play|generate|create|make|draw|search|google|youtube|mute|unmute|increase|decrease|turn|volume|write|remind|tell|what|who)\b")
+
+SystemCommands = {
+    "mute": "mute", "unmute": "unmute",
+    "volume up": "volume up", "increase volume": "volume up", "increase the volume": "volume up", "turn up the volume": "volume up", "turn the volume up": "volume up",
+    "volume down": "volume down", "decrease volume": "volume down", "decrease the volume": "volume down", "turn down the volume": "volume down", "turn the volume down": "volume down",
+}
+
+def _targets(func, text):
+    """Split "chrome, firefox and notepad" into one decision per short app name"""
+    targets = [t for t in Splitter.split(text) if t]
+    if not targets or any(len(t.split()) > 3 or NotATarget.search(t) for t in targets):
+        return None
+    return [f"{func} {t}" for t in targets]
+
+# (func, pattern, handler) in priority order; handler(match) -> decision list or None.
+Rules = [
+    ("exit", re.compile(r"^(?:bye|goodbye|good bye|exit|quit)(?: (?:jarvis|maverick|for now|then))?$"), lambda m: ["exit"]),
+    ("system", re.compile(r"^(?:" + "|".join(sorted(map(re.escape, SystemCommands), key=len, reverse=True)) + r")$"), lambda m: [f"system {SystemCommands[m.group(0)]}"]),
+    ("open", re.compile(r"^(?:open|launch) (?P<target>.+)$"), lambda m: _targets("open", m.group("target"))),
+    ("close", re.compile(r"^(?:close|quit|exit) (?P<target>.+)$"), lambda m: _targets("close", m.group("target"))),
+    ("generate image", re.compile(r"^(?:generate|create|make|draw) (?:an? )?(?:image|picture|photo)s? (?:of )?(?P<prompt>.+)$"), lambda m: [f"generate image {m.group('prompt')}"]),
+    ("youtube search", re.compile(r"^(?:youtube search|search youtube for|search on youtube for|search on youtube) (?P<topic>.+)$"), lambda m: [f"youtube search {m.group('topic')}"]),
+    ("google search", re.compile(r"^(?:google search|search google for|search on google for|search on google) (?P<topic>.+)$"), lambda m: [f"google search {m.group('topic')}"]),
+    ("play", re.compile(r"^play (?P<song>(?!.*\b(?:and then|then|also)\b).+)$"), lambda m: None if AnotherCommand.search(m.group("song")) else [f"play {m.group('song')}"]),
+    ("general", re.compile(r"^(?:what(?:'s| is) the (?:time|date|day)(?: today| now| right now)?|what time is it(?: now)?|what day is (?:it|today)|what is today's date|how are you|thanks?(?: you)?(?: so much| very much)?)$"), lambda m: [f"general {m.string}"]),
+]
+
+class IntentRouter:
+    def __init__(self, funcs):
+        self.rules = [rule for rule in Rules if rule[0] in funcs]  # Only emit decisions the caller supports
+        self.lock = threading.Lock()
+        self.hits = {}
+        self.misses = 0
+
+    @staticmethod
+    def normalize(query):
+        query = " ".join(query.lower().split())
+        query = Politeness.sub("", query)
+        return Trailing.sub("", query)
+
+    def route(self, query):
+        """Return a decision list for a confidently recognised command, otherwise None"""
+        text = self.normalize(query)
+        for func, pattern, handler in self.rules:
+            match = pattern.match(text)
+            if match:
+                decision = handler(match)
+                if decision:
+                    with self.lock:
+                        self.hits[func] = self.hits.get(func, 0) + 1
+                    return decision
+                break  # Matched the verb but not cleanly; let the model decide
+        with self.lock:
+            self.misses += 1
+        return None
+
+    def stats(self):
+        with self.lock:
+            hits = sum(self.hits.values())
+            total = hits + self.misses
+            return {"hits": hits, "misses": self.misses, "hit_rate": hits / total if total else 0.0, "by_func": dict(self.hits)}
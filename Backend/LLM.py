@@ -0,0 +1,122 @@
+import threading  # For creating the shared clients once
+import asyncio  # For the async client registry
+import weakref  # For per-event-loop async clients
+import httpx  # For pooled keep-alive connections
+import cohere
+from groq import Groq, AsyncGroq  # type: ignore
+from dotenv import dotenv_values  # For API keys and model overrides
+
+env_vars = dotenv_values(".env")
+GroqAPIKey = env_vars.get("GroqAPIKey") or "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"
+CohereAPIKey = env_vars.get("CohereAPIKey")
+
+# One place for model settings. Each can be overridden from .env, e.g.
+# ChatModel=llama3-8b-8192 or ContentMaxTokens=4096.
+Profiles = {
+    "chat": {"model": "llama3-70b-8192", "temperature": 0.7, "max_tokens": 1024, "top_p": 1},
+    "realtime": {"model": "llama3-70b-8192", "temperature": 0.7, "max_tokens": 2048, "top_p": 1},
+    "content": {"model": "mixtral-8x7b-32768", "temperature": 0.7, "max_tokens": 2048, "top_p": 1},
+    "decision": {"model": "command-r-plus", "temperature": 0.7},
+}
+for name, profile in Profiles.items():
+    prefix = name.capitalize()
+    profile["model"] = env_vars.get(f"{prefix}Model", profile["model"])
+    profile["temperature"] = float(env_vars.get(f"{prefix}Temperature", profile["temperature"]))
+    if "max_tokens" in profile:
+        profile["max_tokens"] = int(env_vars.get(f"{prefix}MaxTokens", profile["max_tokens"]))
+
+Limits = httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=60)
+Timeout = httpx.Timeout(60.0, connect=5.0)
+
+_lock = threading.Lock()
+_clients = {}
+_async_clients = weakref.WeakKeyDictionary()  # event loop -> {"groq": AsyncGroq, "cohere": cohere.AsyncClient}
+
+def _client(provider):
+    """Shared sync client; all threads reuse its warm connection pool"""
+    with _lock:
+        if provider not in _clients:
+            http_client = httpx.Client(limits=Limits, timeout=Timeout)
+            if provider == "groq":
+                _clients[provider] = Groq(api_key=GroqAPIKey, http_client=http_client)
+            else:
+                _clients[provider] = cohere.Client(api_key=CohereAPIKey, httpx_client=http_client)
+        return _clients[provider]
+
+def _async_client(provider):
+    """Async client for the running event loop; httpx async pools cannot cross loops"""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        clients = _async_clients.setdefault(loop, {})
+        if provider not in clients:
+            http_client = httpx.AsyncClient(limits=Limits, timeout=Timeout)
+            if provider == "groq":
+                clients[provider] = AsyncGroq(api_key=GroqAPIKey, http_client=http_client)
+            else:
+                clients[provider] = cohere.AsyncClient(api_key=CohereAPIKey, httpx_client=http_client)
+        return clients[provider]
+
+def _groq_args(profile, messages, timeout, overrides):
+    settings = dict(Profiles[profile], **overrides)
+    args = {key: settings[key] for key in ("model", "temperature", "max_tokens", "top_p")}
+    args.update(messages=messages, stream=True, stop=None)
+    if timeout:
+        args["timeout"] = timeout  # An explicit None would disable the client's own timeout
+    return args
+
+def _cohere_args(profile, message, timeout, overrides):
+    settings = dict(Profiles[profile], **overrides)
+    args = {"model": settings["model"], "temperature": settings["temperature"], "message": message, "prompt_truncation": "OFF", "connectors": []}
+    args.update((key, settings[key]) for key in ("preamble", "chat_history") if key in settings)
+    if timeout:
+        args["request_options"] = {"timeout_in_seconds": max(1, int(timeout))}
+    return args
+
+def Stream(profile, messages, timeout=None, **overrides):
+    """Yield the text pieces of a Groq chat completion"""
+    completion = _client("groq").chat.completions.create(**_groq_args(profile, messages, timeout, overrides))
+    try:
+        for chunk in completion:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    finally:
+        completion.close()  # Also runs when the caller stops early
+
+def Complete(profile, messages, timeout=None, **overrides):
+    return "".join(Stream(profile, messages, timeout, **overrides))
+
+def CohereStream(profile, message, timeout=None, **overrides):
+    """Yield the text pieces of a Cohere chat; pass preamble= and chat_history= as overrides"""
+    stream = _client("cohere").chat_stream(**_cohere_args(profile, message, timeout, overrides))
+    try:
+        for event in stream:
+            if event.event_type == "text-generation":
+                yield event.text
+            elif event.event_type == "stream-end":
+                break
+    finally:
+        stream.close()
+
+async def AsyncStream(profile, messages, timeout=None, **overrides):
+    completion = await _async_client("groq").chat.completions.create(**_groq_args(profile, messages, timeout, overrides))
+    try:
+        async for chunk in completion:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    finally:
+        await completion.close()
+
+async def AsyncComplete(profile, messages, timeout=None, **overrides):
+    """Awaitable full answer; run several with asyncio.gather to share one pool"""
+    return "".join([piece async for piece in AsyncStream(profile, messages, timeout, **overrides)])
+
+async def AsyncCohereStream(profile, message, timeout=None, **overrides):
+    stream = _async_client("cohere").chat_stream(**_cohere_args(profile, message, timeout, overrides))
+    try:
+        async for event in stream:
+            if event.event_type == "text-generation":
+                yield event.text
+            elif event.event_type == "stream-end":
+                break
+    finally:
+        await stream.aclose()
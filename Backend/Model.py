@@ -1,6 +1,17 @@
-import cohere
+import atexit
+import itertools
+import json
+import time
+import os
 from rich import print
 from dotenv import dotenv_values
+from Backend.IntentRouter import IntentRouter
+from Backend.Cache import TTLCache
+from Backend.IntentClassifier import IntentClassifier, DecisionLogPath
+from Backend.Resilience import Policy
+from Backend import LLM
+from Backend.PromptAssembler import FewShotIndex, ChatHistoryPairs, AssemblePrompt, CompactPreamble
+from Backend.DecisionExamples import funcs, ChatHistory
 
 # Load environment variables
 env_vars = dotenv_values(".env")
@@ -12,15 +23,63 @@ if not CohereAPIKey:
     print("[bold red]Error:[/bold red] Cohere API key not found in .env file")
     exit(1)
 
-co = cohere.Client(api_key=CohereAPIKey)
-#Define the list of functions that the model can perform.
-funcs = [
-    "exit", "general", "realtime", "open", "close", "play",
-    "generate image", "system", "content", "google search",
-    "youtube search", "reminder"
-]
+# Local pattern router tried before the model; disable with LocalIntentRouter=False.
+LocalIntentRouter = str(env_vars.get("LocalIntentRouter", "True")).lower() != "false"
+Router = IntentRouter(funcs)
 
-messages = []
+# Memoized model decisions keyed on the normalized query. Realtime decisions
+# expire quickly, fixed commands live for a week. Saved to Data/DecisionCache.json
+# across restarts unless DecisionCachePersist=False.
+DecisionTTL = {"realtime": 5 * 60, "general": 60 * 60, "reminder": 60 * 60, "content": 24 * 60 * 60}
+DefaultDecisionTTL = 7 * 24 * 60 * 60  # open, close, play, system, searches, exit
+Decisions = TTLCache(maxsize=int(env_vars.get("DecisionCacheSize", 2000)))
+DecisionCachePath = os.path.join("Data", "DecisionCache.json")
+DecisionCachePersist = str(env_vars.get("DecisionCachePersist", "True")).lower() != "false"
+
+def DecisionCacheTTL(decision):
+    """Shortest TTL among the decided tasks"""
+    ttls = []
+    for task in decision:
+        func = next((f for f in funcs if task.startswith(f)), "general")
+        ttls.append(DecisionTTL.get(func, DefaultDecisionTTL))
+    return min(ttls)
+
+def SaveDecisionCache():
+    try:
+        os.makedirs("Data", exist_ok=True)
+        Decisions.save(DecisionCachePath)
+    except OSError as e:
+        print(f"[bold red]Decision cache not saved:[/bold red] {e}")
+
+if DecisionCachePersist:
+    Decisions.load(DecisionCachePath)
+    atexit.register(SaveDecisionCache)
+
+# Offline classifier (python -m Backend.IntentClassifier train) used when the
+# Cohere API fails, or for every query with OfflineDMM=True. Model decisions
+# are appended to Data/DecisionLog.jsonl as training data unless DecisionLog=False.
+Classifier = IntentClassifier.load()
+OfflineDMM = str(env_vars.get("OfflineDMM", "False")).lower() == "true"
+DecisionLog = str(env_vars.get("DecisionLog", "True")).lower() != "false"
+
+def LogDecision(prompt, decision):
+    try:
+        with open(DecisionLogPath, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"query": prompt, "decision": decision, "ts": time.time()}, ensure_ascii=False) + "\n")
+    except OSError as e:
+        print(f"[bold red]Decision log error:[/bold red] {e}")
+
+def OfflineDecision(prompt):
+    """Single-task decision from the local classifier; 'general' when no model is trained"""
+    text = Router.normalize(prompt)
+    category = Classifier.predict(text)[0] if Classifier else "general"
+    if category == "exit":
+        return ["exit"]
+    if category in ("general", "realtime"):
+        return [f"{category} {text}"]
+    if text.startswith(category):
+        return [text]
+    return [f"{category} {' '.join(text.split()[1:])}"]  # "launch spotify" -> "open spotify"
 
 preamble = """
 You are a very accurate Decision-Making Model, which decides what kind of a query is given to you.
@@ -42,77 +101,111 @@ You will decide whether a query is a 'general' query, a 'realtime' query, or is
 *** Respond with 'general (query)' if you can't decide the kind of query or if a query is asking to perform a task which is not mentioned above. ***
 """
 
-# Fixed ChatHistory roles (changed to lowercase)
-ChatHistory = [
-    {"role": "user", "message": "how are you?"},  # Changed from "User"
-    {"role": "chatbot", "message": "general how are you?"},  # Changed from "Chatbot"
-    {"role": "user", "message": "do you like pizza?"},
-    {"role": "chatbot", "message": "general do you like pizza?"},
-    {"role": "user", "message": "open chrome and tell me about mahatma gandhi."},
-    {"role": "chatbot", "message": "open chrome, general tell me about mahatma gandhi."},
-    {"role": "user", "message": "open chrome and firefox"},
-    {"role": "chatbot", "message": "open chrome, open firefox"},
-    {"role": "user", "message": "what is today's date and by the way remind me that i have a dancing performance on 5th Aug at 11:00pm"},
-    {"role": "chatbot", "message": "general what is today's date, reminder 11:00pm 5th aug dancing performance"},
-    {"role": "user", "message": "chat with me."},
-    {"role": "chatbot", "message": "general chat with me."}
-]
+# The DMM prompt is assembled per query: the compact preamble (CompactPreamble=False
+# sends the full one) plus the FewShotExamples most similar examples, drawn from
+# ChatHistory and from earlier decisions, instead of every example every time.
+UseCompactPreamble = str(env_vars.get("CompactPreamble", "True")).lower() != "false"
+FewShotExamples = int(env_vars.get("FewShotExamples", 4))
+ShowPromptTokens = str(env_vars.get("ShowPromptTokens", "False")).lower() == "true"
+Examples = FewShotIndex(ChatHistoryPairs(ChatHistory))
+Examples.load_log(DecisionLogPath)
+PromptStats = {"calls": 0, "tokens": 0}
+
+def PromptTokenStats():
+    calls = PromptStats["calls"]
+    return {"calls": calls, "tokens": PromptStats["tokens"], "average": PromptStats["tokens"] / calls if calls else 0.0}
+
+# Bounded retries with jittered backoff and an overall deadline for the DMM
+# call; HedgedRequests=True also races a second request once the first is
+# slower than the recent p95.
+DecisionPolicy = Policy("dmm", attempts=3, deadline=float(env_vars.get("DecisionDeadline", 15)))
+DecisionReasks = 1
+
+def ParseTask(task):
+    """Return the cleaned task if it starts with a known function, else None"""
+    task = task.strip()
+    for func in funcs:
+        if task.startswith(func):
+            return task
+    return None
+
+def FirstLayerDMMStream(prompt: str = "test"):
+    """Yield each decided task as soon as its comma (or the end of the stream) arrives"""
+    # Plain commands are decided locally without a network round trip.
+    if LocalIntentRouter:
+        decision = Router.route(prompt)
+        if decision is not None:
+            yield from decision
+            return
+
+    key = Router.normalize(prompt)
+    cached = Decisions.get(key)
+    if cached is not None:
+        yield from cached
+        return
+
+    if OfflineDMM and Classifier:
+        yield from OfflineDecision(prompt)
+        return
+
+    prompt_preamble, examples, tokens = AssemblePrompt(Examples, prompt, CompactPreamble if UseCompactPreamble else preamble, FewShotExamples)
+    PromptStats["calls"] += 1
+    PromptStats["tokens"] += tokens
+    if ShowPromptTokens:
+        print(f"[dim]DMM prompt: ~{tokens} tokens[/dim]")
+
+    # Tasks are comma separated; emit each one once its comma arrives so the
+    # caller can start acting while the model is still generating. An answer
+    # with no usable task is asked again at most DecisionReasks times.
+    response = []
+    for attempt in range(1 + DecisionReasks):
+        try:
+            first, stream = DecisionPolicy.stream(lambda timeout: LLM.CohereStream("decision", prompt, timeout, preamble=prompt_preamble, chat_history=examples))
+        except Exception as e:
+            print(f"[bold red]API Error:[/bold red] {e}")
+            break
+
+        pending = ""
+        try:
+            for text in itertools.chain([first], stream):
+                pending += text.replace("\n", "")
+                *complete, pending = pending.split(",")
+                for task in complete:
+                    task = ParseTask(task)
+                    if task:
+                        response.append(task)
+                        yield task
+        except Exception as e:
+            print(f"[bold red]Stream Error:[/bold red] {e}")
+            if response:
+                return  # Partial decision; already acted on, so not cached
+            continue
+
+        task = ParseTask(pending)
+        if task:
+            response.append(task)
+            yield task
+        if response:
+            break
+
+    if not response:
+        yield from OfflineDecision(prompt)
+        return
+    Decisions.set(key, response, ttl=DecisionCacheTTL(response))
+    Examples.add(prompt, ", ".join(response))
+    if DecisionLog:
+        LogDecision(prompt, response)
 
 def FirstLayerDMM(prompt: str = "test"):
-    messages.append({"role": "user", "content": f"{prompt}"})
-    
-    try:
-        # API call with proper error handling
-        stream = co.chat_stream(
-            model="command-r-plus",
-            message=prompt,
-            temperature=0.7,
-            chat_history=ChatHistory,
-            prompt_truncation="OFF",
-            connectors=[],
-            preamble=preamble
-        )
-    except cohere.CohereError as e:
-        print(f"[bold red]API Error:[/bold red] {e}")
-        return []
-
-    response = ""
-    try:
-        for event in stream:
-            if event.event_type == "text-generation":
-                response += event.text
-            if event.event_type == "stream-end":
-                break
-    except Exception as e:
-        print(f"[bold red]Stream Error:[/bold red] {e}")
-        return []
-
-    # Response processing
-    response = response.replace("\n", "")
-    response = response.split(",")
-
-    response = [i.strip() for i in response]
-    
-    temp = []
-
-    for task in response:
-        for func in funcs:
-            if task.startswith(func):
-                temp.append(task)
-                break  # Exit inner loop once match found
-
-    response = temp
-
-    # Prevent infinite recursion
-    if "query" in response:
-        newresponse = FirstLayerDMM(prompt=prompt)
-        return newresponse
-    else:
-        return response
+    return list(FirstLayerDMMStream(prompt))
 
 if __name__ == "__main__":
     try:
         while True:
            print(FirstLayerDMM(input(">>> ")))
     except KeyboardInterrupt:
-        print("\n[bold yellow]Exiting...[/bold yellow]")
\ No newline at end of file
+        print("\n[bold yellow]Exiting...[/bold yellow]")
+        print(f"Router: {Router.stats()}")
+        print(f"Decision cache: {Decisions.stats()}")
+        print(f"DMM prompts: {PromptTokenStats()}")
+        print(f"DMM calls: {DecisionPolicy.stats()}")
\ No newline at end of file
@@ -0,0 +1,111 @@
+import collections  # For the bounded example pool
+import threading  # For guarding the index
+import math  # For idf weights
+import json  # For reading the decision log
+import re  # For tokenizing
+from Backend.ContextBuilder import EstimateTokens
+
+WordPattern = re.compile(r"[a-z0-9']+")
+
+# Short form of the Decision-Making Model preamble in Backend/Model.py. It keeps
+# every category and rule but drops the long lists of worked examples, which
+# the few-shot examples picked per query now provide.
+CompactPreamble = """You are a very accurate Decision-Making Model. Do not answer the query; only decide what kind of query it is.
+Reply with one or more comma-separated tasks, each one of:
+-> 'general (query)' if a chatbot can answer it without up-to-date data, if it has no proper noun or is incomplete ('who is he?'), if it asks about the time, day, date, month or year, or if you can't decide.
+-> 'realtime (query)' if it needs up-to-date information or asks about a specific person, thing or the news ('who is indian prime minister', 'what is today's news?').
+-> 'open (application or website)', 'close (application)', 'play (song name)', 'generate image (image prompt)', 'reminder (datetime with message)', 'system (mute, unmute, volume up or volume down)', 'content (topic)', 'google search (topic)', 'youtube search (topic)'.
+*** Split multiple requests into separate tasks: 'open facebook, telegram and close whatsapp' -> 'open facebook, open telegram, close whatsapp'. ***
+*** Respond with 'exit' if the user says goodbye or wants to end the conversation. ***
+"""
+
+def Features(text):
+    """Word and character trigram counts"""
+    words = WordPattern.findall(text.lower())
+    features = collections.Counter("w:" + word for word in words)
+    for word in words:
+        padded = f" {word} "
+        features.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return features
+
+# Local TF-IDF index over (query, decision) few-shot examples. select() returns
+# the k examples most similar to a query so the DMM prompt carries a handful of
+# relevant demonstrations instead of every example on every call.
+class FewShotIndex:
+    def __init__(self, pinned, capacity=500):
+        self.lock = threading.Lock()
+        self.pinned = [(q, d, Features(q)) for q, d in pinned]  # Always kept, e.g. the hand-written ChatHistory pairs
+        self.pinned_keys = {self.key(q) for q, _ in pinned}
+        self.capacity = capacity
+        self.learned = collections.OrderedDict()  # normalized query -> (query, decision, features), newest last
+        self.pool = None  # [(query, decision, weighted features, norm)], rebuilt after changes
+        self.idf = {}
+
+    @staticmethod
+    def key(query):
+        return " ".join(WordPattern.findall(query.lower()))
+
+    def add(self, query, decision):
+        """Learn an example; a repeated query replaces its older decision"""
+        key = self.key(query)
+        if not key or key in self.pinned_keys:
+            return
+        with self.lock:
+            self.learned.pop(key, None)
+            self.learned[key] = (query, decision, Features(query))
+            while len(self.learned) > self.capacity:
+                self.learned.popitem(last=False)
+            self.pool = None
+
+    def build(self):
+        examples = self.pinned + list(self.learned.values())
+        document_frequency = collections.Counter(f for _, _, features in examples for f in features)
+        self.idf = {f: math.log((1 + len(examples)) / (1 + n)) + 1 for f, n in document_frequency.items()}
+        self.pool = []
+        for query, decision, features in examples:
+            weighted = {f: c * self.idf[f] for f, c in features.items()}
+            self.pool.append((query, decision, weighted, math.sqrt(sum(v * v for v in weighted.values())) or 1.0))
+
+    def select(self, query, k=4):
+        """Return up to k (query, decision) pairs, least similar first so the best sits next to the query"""
+        with self.lock:
+            if self.pool is None:
+                self.build()
+            pool, idf = self.pool, self.idf
+        target = {f: c * idf.get(f, 1.0) for f, c in Features(query).items()}
+        target_norm = math.sqrt(sum(v * v for v in target.values())) or 1.0
+        scored = []
+        for example_query, decision, weighted, norm in pool:
+            dot = sum(v * weighted[f] for f, v in target.items() if f in weighted)
+            scored.append((dot / (norm * target_norm), example_query, decision))
+        scored.sort(key=lambda item: item[0], reverse=True)
+        best = [(q, d) for _, q, d in scored[:k]]
+        best.reverse()
+        return best
+
+    def load_log(self, path, limit=500):
+        """Seed learned examples from the newest lines of the decision log"""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                lines = collections.deque(f, maxlen=limit)
+        except OSError:
+            return
+        for line in lines:
+            try:
+                record = json.loads(line)
+                self.add(record["query"], ", ".join(record["decision"]))
+            except (ValueError, KeyError):
+                continue
+
+def ChatHistoryPairs(chat_history):
+    """(query, decision) pairs from a Cohere chat_history list"""
+    return [(user["message"], bot["message"]) for user, bot in zip(chat_history[::2], chat_history[1::2])]
+
+def AssemblePrompt(index, query, preamble, k=4):
+    """Return (preamble, chat_history, estimated prompt tokens) for one DMM call"""
+    chat_history = []
+    for example_query, decision in index.select(query, k):
+        chat_history.append({"role": "user", "message": example_query})
+        chat_history.append({"role": "chatbot", "message": decision})
+    tokens = EstimateTokens(preamble) + sum(EstimateTokens(m["message"]) + 4 for m in chat_history) + EstimateTokens(query) + 4
+    return preamble, chat_history, tokens
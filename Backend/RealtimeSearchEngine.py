@@ -1,10 +1,14 @@
 from http import client
 from googlesearch import search
-from groq import Groq  # Importing the Groq library to use its API.
-from json import load, dump  # Importing functions to read and write JSON files.
 import datetime  # Importing the datetime module for real-time date and time information.
 from dotenv import dotenv_values  # Importing dotenv_values to read environment variables from a .env file.
 import time
+import asyncio  # For the concurrent async variant.
+from Backend.ConversationStore import Conversation  # Shared append-only chat history.
+from Backend.ContextBuilder import ContextBuilder  # Keeps prompts inside the model's context window.
+from Backend import LLM  # Shared pooled model clients.
+from Backend.SearchCache import SearchCache  # Cached Google results.
+from Backend.SearchEnrichment import SearchEnricher  # Optional page text for the prompt.
 
 # Load environment variables from the .env file.
 env_vars = dotenv_values(".env")
@@ -12,30 +16,45 @@ env_vars = dotenv_values(".env")
 # Retrieve environment variables for the chatbot configuration.
 Username = env_vars.get("Username")
 Assistantname = env_vars.get("Assistantname")
-GroqAPIKey = "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"
-
-# Initialize the Groq client with the provided API key.
-Client = Groq(api_key=GroqAPIKey)
 
 # Define the system instructions for the chatbot.
 System = f"""Hello, I am Pranjal, You are a very accurate and advanced AI chatbot named Maverick which has real-time up-to-date knowledge.
 ** Provide Answers In a Professional Way, make sure to add full stops, commas, question marks, and use proper grammar. **
 ** Just answer the question from the provided data in a professional way. **"""
 
-# Try to load the chat log from a JSON file, or create an empty one if it doesn't exist.
-try:
-    with open(r"Data\ChatLog.json", "r") as f:
-        messages = load(f)
-except:
-    with open(r"Data\ChatLog.json", "w") as f:
-        dump([], f)
+# Function to fetch the top Google results as plain dictionaries.
+def SearchResults(query):
+    return [{"title": r.title, "description": r.description, "url": r.url} for r in search(query, advanced=True, num_results=5)]
+
+# Recent searches are answered from memory or Data/SearchCache.db; entries
+# expire per query (minutes for news and live scores, hours otherwise) and
+# slightly stale ones are refreshed in the background. SearchCache=False
+# scrapes every time.
+SearchCacheEnabled = str(env_vars.get("SearchCache", "True")).lower() != "false"
+Searches = SearchCache(SearchResults) if SearchCacheEnabled else None
+if Searches:
+    Searches.prune()
+
+# SearchEnrichment=True fetches the top result pages and sends their most
+# query-relevant sentences instead of the bare snippets.
+SearchEnrichmentEnabled = str(env_vars.get("SearchEnrichment", "False")).lower() == "true"
+Enricher = SearchEnricher(
+    top_k=int(env_vars.get("SearchEnrichmentPages", 3)),
+    page_timeout=float(env_vars.get("SearchEnrichmentTimeout", 2.5)),
+    token_budget=int(env_vars.get("SearchEnrichmentTokens", 600))
+) if SearchEnrichmentEnabled else None
 
 # Function to perform a Google search and format the results.
 def GoogleSearch(query):
-    results = list(search(query, advanced=True, num_results=5))
+    results = Searches.get(query) if Searches else SearchResults(query)
+    if Enricher and results:
+        try:
+            return Enricher.enrich(query, results)
+        except Exception as e:
+            print(f"Search enrichment failed: {e}")
     Answer = f"The search results for '{query}' are:\n[start]\n"
     for i, result in enumerate(results, 1):
-        Answer += f"{i}. {result.title}\n{result.description}\n{result.url}\n\n"
+        Answer += f"{i}. {result['title']}\n{result['description']}\n{result['url']}\n\n"
     Answer += "[end]"
     return Answer
 
@@ -52,6 +71,10 @@ SystemChatBot = [
     {"role": "user", "content": "Hi"},
     {"role": "assistant", "content": "Hello, how can I help you?"}
 ]
+
+# Own rolling summary; the chatbot reserves a different window.
+Context = ContextBuilder()
+
 # Function to get real-time information like the current date and time.
 def Information():
     data = ""
@@ -73,48 +96,56 @@ def Information():
 
     return data
 
-# Function to handle real-time search and response generation.
-def RealtimeSearchEngine(prompt):
-    global SystemChatBot, messages
-
-    # Load the chat log from the JSON file.
-    with open(r"Data\ChatLog.json", "r") as f:
-        messages = load(f)
-    messages.append({"role": "user", "content": f"{prompt}"})
-
-    # Add Google search results to the system chatbot messages.
-    search_results = GoogleSearch(prompt)
-    SystemChatBot.append({"role": "system", "content": search_results})
-
-    # Generate a response using the Groq client.
-    completion = Client.chat.completions.create(
-        model="llama3-70b-8192",
-        messages=SystemChatBot + [{"role": "system", "content": Information()}] + messages,
-        temperature=0.7,
-        max_tokens=2048,
-        top_p=1,
-        stream=True,
-        stop=None
-    )
-
+# Everything one realtime question needs, kept per request so concurrent
+# questions never share or mutate SystemChatBot or a global message list.
+class SearchRequest:
+    def __init__(self, prompt, search_results=None):
+        self.prompt = prompt
+        # Take the recent chat history from the shared in-memory cache.
+        self.messages = Conversation.tail() + [{"role": "user", "content": f"{prompt}"}]
+        self.search_results = search_results  # Already fetched, e.g. by a speculative search
+
+    def search(self):
+        if self.search_results is None:
+            self.search_results = GoogleSearch(self.prompt)
+        return self.search_results
+
+    def prompt_messages(self):
+        """System prompt, search results and real-time info, then as much history as fits"""
+        system = SystemChatBot + [{"role": "system", "content": self.search_results}, {"role": "system", "content": Information()}]
+        return Context.build(system, self.messages, reserve=2048)
+
+    def record(self, Answer):
+        # Clean up the response and append this turn to the chat log.
+        Answer = Answer.strip().replace("</s>", "")
+        Conversation.extend([self.messages[-1], {"role": "assistant", "content": Answer}])
+        return AnswerModifier(Answer=Answer)
+
+# Function to handle real-time search and stream the response as it is generated.
+# The turn is added to the chat log once the stream has been read to the end.
+def RealtimeSearchEngineStream(prompt, search_results=None):
+    request = SearchRequest(prompt, search_results)
+    request.search()
+
+    # Generate a response on the shared Groq connection pool.
     Answer = ""
+    for text in LLM.Stream("realtime", request.prompt_messages()):
+        Answer += text
+        yield text
+    request.record(Answer)
 
-    # Concatenate response chunks from the streaming output.
-    for chunk in completion:
-        if chunk.choices[0].delta.content:
-            Answer += chunk.choices[0].delta.content
-
-    # Clean up the response.
-    Answer = Answer.strip().replace("</s>", "")
-    messages.append({"role": "assistant", "content": Answer})
-
-    # Save the updated chat log back to the JSON file.
-    with open(r"Data\ChatLog.json", "w") as f:
-        dump(messages, f, indent=4)
-
-    # Remove the most recent system message from the chatbot conversation.
-    SystemChatBot.pop()
-    return AnswerModifier(Answer=Answer)
+# Function to handle real-time search and response generation.
+def RealtimeSearchEngine(prompt):
+    Answer = "".join(RealtimeSearchEngineStream(prompt))
+    return AnswerModifier(Answer=Answer.strip().replace("</s>", ""))
+
+# Async variant: several questions ("news and weather") can be searched and
+# answered at once with asyncio.gather, each with its own SearchRequest.
+async def RealtimeSearchEngineAsync(prompt, search_results=None):
+    request = SearchRequest(prompt, search_results)
+    await asyncio.to_thread(request.search)  # The Google scrape is blocking
+    Answer = await LLM.AsyncComplete("realtime", request.prompt_messages())
+    return request.record(Answer)
 
 # Main entry point of the program for interactive querying.
 if __name__ == "__main__":
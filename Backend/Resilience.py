@@ -0,0 +1,128 @@
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED  # For hedged attempts
+import collections  # For the latency window
+import threading  # For thread-safe counters
+import random  # For backoff jitter
+import time  # For deadlines and latency measurement
+from dotenv import dotenv_values  # For the hedging switch in .env
+
+env_vars = dotenv_values(".env")
+HedgedRequests = str(env_vars.get("HedgedRequests", "False")).lower() == "true"
+
+Executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="Hedge")
+
+class DeadlineExceeded(TimeoutError):
+    pass
+
+# Retry policy for one kind of remote call: a bounded number of attempts with
+# full-jitter exponential backoff, all inside one overall deadline. With hedge
+# on, an attempt that is still running after the p95 of recent latencies gets
+# a second, identical request; the first to succeed wins and the other one's
+# result is handed to cleanup (e.g. to close its stream).
+class Policy:
+    def __init__(self, name, attempts=3, base_delay=0.5, max_delay=8.0, deadline=30.0, hedge=HedgedRequests, min_samples=20, window=200):
+        self.name = name
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.hedge = hedge
+        self.min_samples = min_samples  # Latencies needed before the p95 is trusted
+        self.lock = threading.Lock()
+        self.latencies = collections.deque(maxlen=window)
+        self.counters = {"calls": 0, "retries": 0, "failures": 0, "hedges": 0, "hedge_wins": 0, "deadlines": 0}
+
+    def count(self, counter):
+        with self.lock:
+            self.counters[counter] += 1
+
+    def record(self, seconds):
+        with self.lock:
+            self.latencies.append(seconds)
+
+    def p95(self):
+        with self.lock:
+            if len(self.latencies) < self.min_samples:
+                return None
+            ordered = sorted(self.latencies)
+        return ordered[int(len(ordered) * 0.95) - 1]
+
+    def backoff(self, attempt):
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def call(self, func, cleanup=None):
+        """Return func(timeout), retrying failures; timeout is the number of seconds left before the deadline"""
+        self.count("calls")
+        deadline = time.monotonic() + self.deadline
+        error = None
+        for attempt in range(self.attempts):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                return self.attempt(func, remaining, cleanup)
+            except Exception as e:
+                error = e
+                self.count("failures")
+            if attempt + 1 < self.attempts:
+                delay = self.backoff(attempt)
+                if time.monotonic() + delay >= deadline:
+                    break
+                self.count("retries")
+                time.sleep(delay)
+        else:
+            raise error
+        self.count("deadlines")
+        raise DeadlineExceeded(f"{self.name}: no answer within {self.deadline:g}s") from error
+
+    def stream(self, open_stream):
+        """Open open_stream(timeout) under this policy and wait for its first piece; returns (first_piece, stream)"""
+        def start(timeout):
+            stream = open_stream(timeout)
+            first = next(stream, None)
+            if first is None:
+                raise RuntimeError(f"{self.name}: empty stream")
+            return first, stream
+
+        return self.call(start, cleanup=lambda opened: opened[1].close())  # Hedge loser: drop its connection
+
+    def attempt(self, func, timeout, cleanup):
+        start = time.monotonic()
+        delay = self.p95() if self.hedge else None
+        if delay is None or delay >= timeout:
+            result = func(timeout)
+            self.record(time.monotonic() - start)
+            return result
+
+        futures = [Executor.submit(func, timeout)]
+        done, _ = wait(futures, timeout=delay)
+        if not done:
+            self.count("hedges")
+            futures.append(Executor.submit(func, timeout - (time.monotonic() - start)))
+        pending = set(futures)
+        error = None
+        winner = None
+        while pending and winner is None:
+            done, pending = wait(pending, timeout=timeout - (time.monotonic() - start), return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                if future.exception() is None and winner is None:
+                    winner = future
+                elif future.exception() is not None:
+                    error = future.exception()
+
+        # Whatever is still running loses; release its result when it arrives.
+        for future in futures:
+            if future is not winner and not future.cancel() and cleanup:
+                future.add_done_callback(lambda f: f.exception() is None and cleanup(f.result()))
+        if winner is None:
+            raise error or DeadlineExceeded(f"{self.name}: attempt timed out after {timeout:.1f}s")
+        self.record(time.monotonic() - start)
+        if winner is not futures[0]:
+            self.count("hedge_wins")
+        return winner.result()
+
+    def stats(self):
+        p95 = self.p95()
+        with self.lock:
+            return dict(self.counters, p95_ms=None if p95 is None else p95 * 1000)
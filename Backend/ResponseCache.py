@@ -0,0 +1,99 @@
+import threading  # For thread-safe counters and feature index
+import math  # For cosine similarity
+import re  # For the time-sensitive and follow-up patterns
+from Backend.Cache import TTLCache
+from Backend.IntentRouter import IntentRouter
+from Backend.PromptAssembler import Features
+
+# Questions whose answer depends on when they are asked or on the
+# conversation so far; these always go to the model.
+TimeSensitive = re.compile(r"\b(?:today|tonight|now|current(?:ly)?|latest|recent(?:ly)?|news|time|date|day|weather|tomorrow|yesterday|this (?:week|month|year)|score|price|stock|live)\b")
+FollowUp = re.compile(r"\b(?:he|she|it|they|him|her|them|his|its|their|that|this|those|these|my|me|i|i'm|we|our|again|previous|earlier|above|more)\b")
+Punctuation = re.compile(r"[^\w\s']+")
+Numbers = re.compile(r"\d+")
+
+# Answer cache for general ChatBot questions. An exact match on the normalized
+# query is a dictionary lookup; otherwise the query is compared with every
+# cached question by word and character trigram cosine similarity, and an
+# answer is reused when the best one reaches the threshold and both questions
+# contain the same numbers ("2 plus 2" must not answer "2 plus 3").
+class ResponseCache:
+    def __init__(self, maxsize=500, ttl=7 * 24 * 60 * 60, threshold=0.92):
+        self.answers = TTLCache(maxsize=maxsize, ttl=ttl)  # normalized query -> answer
+        self.threshold = threshold
+        self.lock = threading.Lock()
+        self.features = {}  # normalized query -> (features, norm, numbers)
+        self.counters = {"exact": 0, "similar": 0, "misses": 0, "bypassed": 0}
+
+    @staticmethod
+    def normalize(query):
+        return " ".join(Punctuation.sub(" ", IntentRouter.normalize(query)).split())
+
+    @staticmethod
+    def cacheable(key):
+        return bool(key) and not TimeSensitive.search(key) and not FollowUp.search(key)
+
+    def count(self, counter):
+        with self.lock:
+            self.counters[counter] += 1
+
+    def vector(self, key):
+        features = Features(key)
+        return features, math.sqrt(sum(c * c for c in features.values())) or 1.0, Numbers.findall(key)
+
+    def get(self, query):
+        """Return a cached answer for query or a near-identical question, else None"""
+        key = self.normalize(query)
+        if not self.cacheable(key):
+            self.count("bypassed")
+            return None
+        answer = self.answers.get(key)
+        if answer is not None:
+            self.count("exact")
+            return answer
+
+        features, norm, numbers = self.vector(key)
+        best, best_score = None, 0.0
+        live = set(self.answers.keys())
+        with self.lock:
+            for stale in self.features.keys() - live:
+                del self.features[stale]  # Evicted or expired from the answer cache
+            candidates = list(self.features.items())
+        for candidate, (other, other_norm, other_numbers) in candidates:
+            if other_numbers != numbers:
+                continue
+            score = sum(c * other[f] for f, c in features.items() if f in other) / (norm * other_norm)
+            if score > best_score:
+                best, best_score = candidate, score
+        if best is not None and best_score >= self.threshold:
+            answer = self.answers.get(best)
+            if answer is not None:
+                self.count("similar")
+                return answer
+        self.count("misses")
+        return None
+
+    def put(self, query, answer):
+        key = self.normalize(query)
+        if not answer or not self.cacheable(key):
+            return
+        self.answers.set(key, answer)
+        vector = self.vector(key)
+        with self.lock:
+            self.features[key] = vector
+
+    def save(self, path):
+        self.answers.save(path)
+
+    def load(self, path):
+        self.answers.load(path)
+        vectors = {key: self.vector(key) for key in self.answers.keys()}
+        with self.lock:
+            self.features.update(vectors)
+
+    def stats(self):
+        with self.lock:
+            counters = dict(self.counters)
+        hits = counters["exact"] + counters["similar"]
+        lookups = hits + counters["misses"]
+        return dict(counters, size=len(self.answers.keys()), hit_rate=hits / lookups if lookups else 0.0)
@@ -0,0 +1,139 @@
+import collections  # For the in-memory LRU
+import threading  # For locking and background refreshes
+import sqlite3  # For the on-disk store
+import json  # For storing result lists
+import time  # For freshness timestamps
+import re  # For query normalization and TTL rules
+import os  # For file handling
+
+Punctuation = re.compile(r"[^\w\s]+")
+
+# Per-query freshness: (pattern, seconds) checked in order, first match wins.
+SearchTTLRules = [
+    (re.compile(r"\b(?:live|score|scores|price|prices|stock|stocks|weather|now|right now)\b"), 2 * 60),
+    (re.compile(r"\b(?:news|today|tonight|latest|headline|headlines|breaking|current)\b"), 10 * 60),
+    (re.compile(r"\b(?:this (?:week|month|year)|recent|yesterday|tomorrow)\b"), 60 * 60),
+]
+DefaultSearchTTL = 6 * 60 * 60
+
+def SearchTTL(key):
+    return next((ttl for pattern, ttl in SearchTTLRules if pattern.search(key)), DefaultSearchTTL)
+
+# Search-result cache with a size-bounded in-memory LRU in front of a SQLite
+# store. A fresh entry is returned as is. An entry past its TTL but still
+# inside the stale window (as long again as its TTL) is returned at once
+# while a background thread fetches a replacement. Only a miss or a fully
+# expired entry waits for fetch(query).
+class SearchCache:
+    def __init__(self, fetch, path=os.path.join("Data", "SearchCache.db"), maxsize=200, ttl=SearchTTL):
+        self.fetch = fetch  # fetch(query) -> JSON-serializable results
+        self.maxsize = maxsize
+        self.ttl = ttl  # ttl(normalized query) -> seconds
+        self.lock = threading.Lock()
+        self.memory = collections.OrderedDict()  # key -> (fetched_at, ttl, results)
+        self.refreshing = set()
+        self.counters = {"fresh": 0, "stale": 0, "misses": 0, "refreshes": 0, "errors": 0}
+        self.db = None
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self.db = sqlite3.connect(path, check_same_thread=False)
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS search_cache ("
+                "key TEXT PRIMARY KEY, results TEXT NOT NULL, fetched_at REAL NOT NULL, ttl REAL NOT NULL)"
+            )
+            self.db.commit()
+
+    @staticmethod
+    def normalize(query):
+        return " ".join(Punctuation.sub(" ", query.lower()).split())
+
+    def lookup(self, key):
+        """Return (fetched_at, ttl, results) from memory or disk, or None"""
+        with self.lock:
+            entry = self.memory.get(key)
+            if entry is not None:
+                self.memory.move_to_end(key)
+                return entry
+            if self.db is None:
+                return None
+            row = self.db.execute("SELECT fetched_at, ttl, results FROM search_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            entry = (row[0], row[1], json.loads(row[2]))
+            self.remember(key, entry)
+            return entry
+
+    def remember(self, key, entry):
+        self.memory[key] = entry
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.maxsize:
+            self.memory.popitem(last=False)
+
+    def store(self, key, results):
+        if not results:
+            return  # Likely a blocked or failed scrape; try again next time
+        entry = (time.time(), self.ttl(key), results)
+        with self.lock:
+            self.remember(key, entry)
+            if self.db is not None:
+                self.db.execute("INSERT OR REPLACE INTO search_cache (key, results, fetched_at, ttl) VALUES (?, ?, ?, ?)", (key, json.dumps(results, ensure_ascii=False), *entry[:2]))
+                self.db.commit()
+
+    def count(self, counter):
+        with self.lock:
+            self.counters[counter] += 1
+
+    def get(self, query):
+        key = self.normalize(query)
+        entry = self.lookup(key)
+        if entry is not None:
+            fetched_at, ttl, results = entry
+            age = time.time() - fetched_at
+            if age < ttl:
+                self.count("fresh")
+                return results
+            if age < 2 * ttl:
+                self.count("stale")
+                self.refresh(query, key)
+                return results
+        self.count("misses")
+        results = self.fetch(query)
+        self.store(key, results)
+        return results
+
+    def refresh(self, query, key):
+        """Fetch a replacement in the background; at most one refresh per key at a time"""
+        with self.lock:
+            if key in self.refreshing:
+                return
+            self.refreshing.add(key)
+
+        def run():
+            try:
+                self.store(key, self.fetch(query))
+                self.count("refreshes")
+            except Exception as e:
+                self.count("errors")
+                print(f"Search refresh failed for '{query}': {e}")
+            finally:
+                with self.lock:
+                    self.refreshing.discard(key)
+
+        threading.Thread(target=run, name="SearchRefresh", daemon=True).start()
+
+    def prune(self):
+        """Delete on-disk entries past their stale window"""
+        if self.db is None:
+            return
+        with self.lock:
+            self.db.execute("DELETE FROM search_cache WHERE fetched_at + 2 * ttl < ?", (time.time(),))
+            self.db.commit()
+
+    def stats(self):
+        with self.lock:
+            counters = dict(self.counters)
+            size = len(self.memory)
+        lookups = counters["fresh"] + counters["stale"] + counters["misses"]
+        hits = counters["fresh"] + counters["stale"]
+        return dict(counters, memory=size, hit_rate=hits / lookups if lookups else 0.0)
@@ -0,0 +1,195 @@
+import collections  # For term counts
+import threading  # For the background event loop
+import asyncio  # For concurrent page fetching
+import math  # For BM25 weights
+import time  # For the demo timings
+import re  # For tokenizing and sentence splitting
+import httpx  # For the pooled async HTTP client
+from bs4 import BeautifulSoup  # For extracting the main text of a page
+from Backend.ContextBuilder import EstimateTokens
+
+UserAgent = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/100.0.4896.75 Safari/537.36"
+WordPattern = re.compile(r"\w+")
+SentencePattern = re.compile(r"\n+|(?<=[.!?])\s+(?=[A-Z0-9\"'(])")
+StopWords = frozenset("a an and are as at be by for from has have in is it its of on or that the this to was were what when where which who why will with how".split())
+Boilerplate = ["script", "style", "noscript", "nav", "header", "footer", "aside", "form", "svg", "iframe", "button"]
+
+Suffix = re.compile(r"(?:ing|ed|es|s)$")
+
+def Terms(text):
+    """Lowercased content words with a light suffix strip ("landed" matches "land")"""
+    return [Suffix.sub("", word) if len(word) > 4 else word for word in WordPattern.findall(text.lower()) if word not in StopWords]
+
+def ExtractText(html):
+    """Readable main text of an HTML page without navigation, scripts and other boilerplate"""
+    soup = BeautifulSoup(html, "html.parser")
+    for tag in soup(Boilerplate):
+        tag.decompose()
+    main = soup.find("article") or soup.find("main") or soup.body or soup
+    lines = (" ".join(line.split()) for line in main.get_text("\n").splitlines())
+    return "\n".join(line for line in lines if line)  # One line per block, so headings stay apart
+
+def BM25(query_terms, documents, k1=1.5, b=0.75):
+    """BM25 score of every tokenized document against the query terms"""
+    if not documents:
+        return []
+    average = sum(len(d) for d in documents) / len(documents) or 1.0
+    frequency = collections.Counter(term for d in documents for term in set(d))
+    idf = {t: math.log(1 + (len(documents) - frequency[t] + 0.5) / (frequency[t] + 0.5)) for t in set(query_terms)}
+    scores = []
+    for document in documents:
+        counts = collections.Counter(document)
+        norm = k1 * (1 - b + b * len(document) / average)
+        scores.append(sum(idf[t] * counts[t] * (k1 + 1) / (counts[t] + norm) for t in idf if counts[t]))
+    return scores
+
+# Optional enrichment for realtime search. The top result pages are fetched
+# concurrently on one pooled async HTTP client with a strict per-page
+# deadline; their main text is split into sentences and only the sentences
+# that score best against the query (BM25) are kept, up to a token budget.
+# The client and its event loop live on a background thread so warm
+# connections are reused across searches; a slow or broken page just falls
+# back to its search snippet.
+class SearchEnricher:
+    def __init__(self, top_k=3, page_timeout=2.5, token_budget=600, max_bytes=1_000_000):
+        self.top_k = top_k
+        self.page_timeout = page_timeout
+        self.token_budget = token_budget
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.loop = None
+        self.client = None
+
+    def start(self):
+        with self.lock:
+            if self.loop is None:
+                self.loop = asyncio.new_event_loop()
+                threading.Thread(target=self.loop.run_forever, name="SearchEnrichment", daemon=True).start()
+        return self.loop
+
+    async def fetch(self, url):
+        """Page HTML, or None when it is not HTML, fails, or misses the deadline"""
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                headers={"User-Agent": UserAgent},
+                follow_redirects=True,
+                timeout=httpx.Timeout(self.page_timeout),
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=60),
+            )
+
+        async def read():
+            async with self.client.stream("GET", url) as response:
+                if response.status_code != 200 or "html" not in response.headers.get("content-type", ""):
+                    return None
+                body = bytearray()
+                async for chunk in response.aiter_bytes():
+                    body.extend(chunk)
+                    if len(body) >= self.max_bytes:
+                        break
+                return body.decode(response.encoding or "utf-8", errors="replace")
+
+        try:
+            return await asyncio.wait_for(read(), self.page_timeout)
+        except Exception:  # Timeouts, HTTP errors, invalid URLs: this page just keeps its snippet
+            return None
+
+    @staticmethod
+    def page_text(html):
+        """Main text of a fetched page, or "" when there is none or it cannot be parsed"""
+        try:
+            return ExtractText(html) if html else ""
+        except Exception:
+            return ""
+
+    def select(self, query, pages):
+        """Pick the most query-relevant sentences per page within the token budget"""
+        sentences = []  # (page, position, text)
+        for page, text in enumerate(pages):
+            for position, sentence in enumerate(SentencePattern.split(text or "")):
+                if 30 <= len(sentence) <= 400:
+                    sentences.append((page, position, sentence))
+        scores = BM25(Terms(query), [Terms(s[2]) for s in sentences])
+        chosen, used = [], 0
+        for score, sentence in sorted(zip(scores, sentences), key=lambda item: item[0], reverse=True):
+            if score <= 0:
+                break
+            tokens = EstimateTokens(sentence[2])
+            if used + tokens > self.token_budget:
+                continue
+            chosen.append(sentence)
+            used += tokens
+        selected = [[] for _ in pages]
+        for page, position, text in sorted(chosen):
+            selected[page].append(text)  # Back in reading order
+        return selected
+
+    async def gather(self, query, results):
+        results = results[:self.top_k]
+        pages = await asyncio.gather(*(self.fetch(r["url"]) for r in results))
+        texts = [self.page_text(html) for html in pages]
+        selected = self.select(query, texts)
+        Answer = f"The search results for '{query}' are:\n[start]\n"
+        for i, (result, sentences) in enumerate(zip(results, selected), 1):
+            Answer += f"{i}. {result['title']}\n{result['url']}\n{' '.join(sentences) or result['description']}\n\n"
+        Answer += "[end]"
+        return Answer
+
+    def enrich(self, query, results):
+        """Blocking form for the synchronous search engine"""
+        future = asyncio.run_coroutine_threadsafe(self.gather(query, results), self.start())
+        return future.result(self.page_timeout + 5)
+
+    async def enrich_async(self, query, results):
+        """Awaitable from any event loop; the work still runs on the shared client's loop"""
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(self.gather(query, results), self.start()))
+
+# Demo against a local stand-in for real result pages:
+#   python -m Backend.SearchEnrichment
+if __name__ == "__main__":
+    from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+    Filler = "<nav>Home | News | Sport | Weather | Sign in</nav><script>var tracking = 1;</script>"
+    Pages = {
+        "/article": Filler + "<article><h1>Chandrayaan-3</h1><p>Chandrayaan-3 landed near the lunar south pole on 23 August 2023. "
+                   "The mission was launched by ISRO from Sriharikota. Its rover Pragyan drove about 100 metres on the surface. "
+                   "The weather in Bengaluru was pleasant that week. Many people watched the landing live on television.</p>"
+                   + "<p>Readers also enjoyed our coverage of cricket, film releases and the monsoon forecast for the coming weeks.</p>" * 20
+                   + "</article>"
+                   "<footer>Copyright 2024. All rights reserved. Privacy policy.</footer>",
+        "/main": "<main><p>ISRO confirmed that the Vikram lander touched down at 18:03 IST. Scientists celebrated at the control centre. "
+                 "The stock market rose slightly on the same day. India became the fourth country to soft-land on the Moon.</p></main>",
+        "/slow": "<p>This page answers too late to be used.</p>",
+    }
+
+    class StandIn(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/slow":
+                time.sleep(5)
+            body = f"<html><body>{Pages.get(self.path, '')}</body></html>".encode("utf-8")
+            self.send_response(200 if self.path in Pages else 404)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    results = [
+        {"title": "Chandrayaan-3 mission", "description": "Lunar mission by ISRO.", "url": base + "/article"},
+        {"title": "Vikram lander", "description": "Landing report.", "url": base + "/main"},
+        {"title": "Slow page", "description": "Snippet used because the page timed out.", "url": base + "/slow"},
+    ]
+    query = "when did chandrayaan-3 land on the moon"
+    enricher = SearchEnricher(page_timeout=1.0, token_budget=80)
+    for attempt in ("cold", "warm"):
+        start = time.perf_counter()
+        context = enricher.enrich(query, results)
+        print(f"{attempt}: {(time.perf_counter() - start) * 1000:.0f} ms, ~{EstimateTokens(context)} tokens")
+    full = sum(EstimateTokens(ExtractText(f"<body>{html}</body>")) for html in Pages.values())
+    print(f"full page text: ~{full} tokens\n")
+    print(context)
+    server.shutdown()
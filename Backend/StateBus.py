@@ -0,0 +1,63 @@
+import os  # For building mirror file paths
+import threading  # For locking and change notification
+
+# Thread-safe, in-memory key/value store shared by the GUI and the main loop.
+# Replaces the Mic.data / Status.data / Responses.data file round trips:
+# reads never touch disk, writers notify observers immediately and threads
+# blocked in wait_for() wake up as soon as a value changes.
+class StateBus:
+    def __init__(self, mirror_dir=None):
+        self.values = {}
+        self.observers = {}
+        self.condition = threading.Condition()
+        self.mirror_dir = mirror_dir  # When set, every change is also written to <mirror_dir>/<key>.data
+
+    def get(self, key, default=""):
+        """Return the current value of key without touching disk"""
+        with self.condition:
+            return self.values.get(key, default)
+
+    def set(self, key, value):
+        """Store value, wake waiters and notify observers if it changed"""
+        with self.condition:
+            if key in self.values and self.values[key] == value:
+                return False
+            self.values[key] = value
+            observers = list(self.observers.get(key, ()))
+            self.condition.notify_all()
+
+        if self.mirror_dir:
+            self.write_mirror(key, value)
+
+        # Observers run outside the lock so they may read or set other keys.
+        for callback in observers:
+            try:
+                callback(key, value)
+            except Exception as e:
+                print(f"StateBus observer error for '{key}': {e}")
+        return True
+
+    def subscribe(self, key, callback):
+        """Call callback(key, value) whenever key changes"""
+        with self.condition:
+            self.observers.setdefault(key, []).append(callback)
+        return callback
+
+    def unsubscribe(self, key, callback):
+        with self.condition:
+            if callback in self.observers.get(key, []):
+                self.observers[key].remove(callback)
+
+    def wait_for(self, key, predicate, timeout=None):
+        """Block until predicate(value) is true for key; returns the last seen value"""
+        with self.condition:
+            self.condition.wait_for(lambda: predicate(self.values.get(key, "")), timeout=timeout)
+            return self.values.get(key, "")
+
+    def write_mirror(self, key, value):
+        """Keep the legacy <key>.data file in sync for external readers"""
+        try:
+            with open(os.path.join(self.mirror_dir, f"{key}.data"), "w", encoding="utf-8") as file:
+                file.write(str(value))
+        except OSError as e:
+            print(f"StateBus mirror error for '{key}': {e}")
@@ -1,92 +1,194 @@
 import pygame  # For handling audio playback
+import threading  # For the synthesis and playback workers
+import queue  # For handing sentences and audio between workers
+import re  # For sentence boundary detection
+import io  # For playing synthesized audio from memory
 import random  # For selecting random responses
 import asyncio  # For asynchronous operations
 import edge_tts  # For text-to-speech functionality
-import os  # For handling file paths
 from dotenv import dotenv_values  # For reading environment variables
-import time  # For handling time operations
 
 # Load environment variables from a .env file
 env_vars = dotenv_values(".env")
 AssistantVoice = env_vars.get("AssistantVoice", "en-CA-LiamNeural")  # Default to a voice if not in .env
 
-# Define the path for saving the speech file
-file_path = os.path.join("Data", "speech.mp3")
+# Long answers are cut after this many spoken sentences, followed by a pointer to the chat screen.
+MaxSpokenSentences = int(env_vars.get("MaxSpokenSentences", 2))
 
-# Asynchronous function to convert text to an audio file
-async def TextToAudioFile(text) -> None:
-    file_path = r"Data\speech.mp3"
+responses = [
+    "The rest of the result has been printed to the chat screen, kindly check it out sir.",
+    "The rest of the text is now on the chat screen, sir, please check it.",
+    "You can see the rest of the text on the chat screen, sir.",
+    "The remaining part of the text is now on the chat screen, sir.",
+    "Sir, you'll find more text on the chat screen for you to see.",
+    "The rest of the answer is now on the chat screen, sir.",
+    "Sir, please look at the chat screen, the rest of the answer is there.",
+    "You'll find the complete answer on the chat screen, sir.",
+    "The next part of the text is on the chat screen, sir.",
+    "Sir, please check the chat screen for more information.",
+]
 
-    if os.path.exists(file_path):
-        pygame.mixer.quit()  # Stop pygame mixer before removing file
-        time.sleep(1)  # Ensure the file is released
-        os.remove(file_path)
+SentenceEnd = re.compile(r"(?<=[.!?])[\"')\]]*\s+|\n+")
+Abbreviation = re.compile(r"\b(?:mr|mrs|ms|dr|prof|sr|jr|st|vs|etc|e\.g|i\.e)\.$", re.IGNORECASE)
+NumberSign = re.compile(r"\bno\.$", re.IGNORECASE)  # "No. 5", but "the answer is no." ends a sentence
+ClauseEnd = re.compile(r"[,;:]\s")
 
+# Synthesizes one sentence in memory; no temporary file to delete between sentences.
+async def SynthesizeSentence(text):
     communicate = edge_tts.Communicate(text, AssistantVoice, pitch='+5Hz', rate='+13%')
-    await communicate.save(file_path)
-
-
-# Function to play the generated speech file
-def play_audio(func=lambda _: None):
-    """Plays the saved speech file and handles interruptions."""
-    try:
-        pygame.mixer.init()
-    except pygame.error as e:
-        print(f"Pygame mixer initialization failed: {e}")
-        return False
-
-    try:
-        pygame.mixer.music.load(file_path)
-        pygame.mixer.music.play()
-
-        timeout = 100  # Max iterations to prevent infinite loops (~10 sec)
-        while pygame.mixer.music.get_busy() and timeout > 0:
-            if func(False) is False:
-                break
-            pygame.time.Clock().tick(10)  # Limit to 10 FPS
-            timeout -= 1
-
-        return True
-    except Exception as e:
-        print(f"Error in play_audio: {e}")
-    finally:
-        func(False)
-        pygame.mixer.music.stop()
-        pygame.mixer.quit()
-
-# Function to manage Text-to-Speech (TTS)
-def TTS(Text, func=lambda _: None):  # Changed from lambda: None
-    """Converts text to speech and plays it."""
-    try:
-        asyncio.run(TextToAudioFile(Text))  # Ensure proper async execution
-        play_audio(func)
-    except Exception as e:
-        print(f"Error in TTS: {e}")
+    audio = bytearray()
+    async for chunk in communicate.stream():
+        if chunk["type"] == "audio":
+            audio.extend(chunk["data"])
+    return bytes(audio)
+
+# Incremental sentence splitter for a token stream: feed() returns the
+# sentences completed so far, flush() returns whatever is left at the end.
+class SentenceSplitter:
+    def __init__(self, max_chars=200):
+        self.max_chars = max_chars  # Cut an overlong sentence at a clause boundary
+        self.buffer = ""
+
+    def feed(self, text):
+        self.buffer += text
+        sentences = []
+        start = 0
+        for match in SentenceEnd.finditer(self.buffer):
+            sentence = self.buffer[start:match.end()].strip()
+            if Abbreviation.search(sentence):
+                continue  # "Dr. Kalam" is not a sentence end
+            if NumberSign.search(sentence):
+                following = self.buffer[match.end():match.end() + 1]
+                if not following:
+                    break  # Wait for the next token to tell "No. 5" from "no."
+                if following.isdigit():
+                    continue
+            if sentence:
+                sentences.append(sentence)
+            start = match.end()
+        self.buffer = self.buffer[start:]
+        if len(self.buffer) > self.max_chars:
+            clauses = list(ClauseEnd.finditer(self.buffer))
+            if clauses:
+                sentences.append(self.buffer[:clauses[-1].start() + 1].strip())
+                self.buffer = self.buffer[clauses[-1].end():]
+        return sentences
+
+    def flush(self):
+        sentence, self.buffer = self.buffer.strip(), ""
+        return [sentence] if sentence else []
+
+# Speaks text as it is produced. One worker synthesizes sentence N+1 while
+# the other plays sentence N, so speech starts after the first sentence of an
+# answer instead of after the whole answer. Long answers follow the old
+# policy: the first MaxSpokenSentences sentences, then a pointer to the chat
+# screen. func(False) returning False stops playback, as in play_audio().
+class SpeechPipeline:
+    def __init__(self, func=lambda _: None, max_sentences=MaxSpokenSentences):
+        self.func = func
+        self.max_sentences = max_sentences
+        self.splitter = SentenceSplitter()
+        self.sentences = queue.Queue()
+        self.audio = queue.Queue(maxsize=2)  # Stay at most two sentences ahead of playback
+        self.stopped = threading.Event()
+        self.count = 0  # Sentences seen
+        self.chars = 0
+        self.held = []  # Sentences past the limit, spoken only if the answer stays short
+        self.truncated = False
+        self.workers = [threading.Thread(target=self.synthesize, daemon=True), threading.Thread(target=self.play, daemon=True)]
+        for worker in self.workers:
+            worker.start()
+
+    def feed(self, text):
+        for sentence in self.splitter.feed(text):
+            self.add(sentence)
+
+    def add(self, sentence):
+        self.count += 1
+        self.chars += len(sentence)
+        if self.truncated:
+            return
+        if self.count <= self.max_sentences:
+            self.sentences.put(sentence)
+        elif self.count > 4 and self.chars > 250:
+            self.truncated = True
+            self.held = []
+            self.sentences.put(random.choice(responses))
+        else:
+            self.held.append(sentence)
+
+    def close(self):
+        """Mark the end of the text; held sentences are spoken if the answer stayed short"""
+        for sentence in self.splitter.flush():
+            self.add(sentence)
+        for sentence in self.held:
+            self.sentences.put(sentence)
+        self.sentences.put(None)
+
+    def follow(self, pieces):
+        """Pass a token stream through unchanged while speaking it"""
+        try:
+            for piece in pieces:
+                self.feed(piece)
+                yield piece
+        finally:
+            self.close()
+
+    def wait(self):
+        for worker in self.workers:
+            worker.join()
+
+    def synthesize(self):
+        loop = asyncio.new_event_loop()
+        try:
+            for sentence in iter(self.sentences.get, None):
+                if self.stopped.is_set():
+                    continue
+                try:
+                    self.audio.put(loop.run_until_complete(SynthesizeSentence(sentence)))
+                except Exception as e:
+                    print(f"Error in TTS: {e}")
+        finally:
+            loop.close()
+            self.audio.put(None)
+
+    def play(self):
+        try:
+            pygame.mixer.init()
+        except pygame.error as e:
+            print(f"Pygame mixer initialization failed: {e}")
+            self.stopped.set()
+        clock = pygame.time.Clock()
+        try:
+            for audio in iter(self.audio.get, None):
+                if self.stopped.is_set():
+                    continue  # Drain so the synthesizer is never blocked
+                pygame.mixer.music.load(io.BytesIO(audio), "mp3")
+                pygame.mixer.music.play()
+                while pygame.mixer.music.get_busy():
+                    if self.func(False) is False:
+                        self.stopped.set()
+                        pygame.mixer.music.stop()
+                        break
+                    clock.tick(20)
+        except Exception as e:
+            print(f"Error in speech playback: {e}")
+            self.stopped.set()
+            for _ in iter(self.audio.get, None):
+                pass
+        finally:
+            self.func(False)
+            if pygame.mixer.get_init():
+                pygame.mixer.music.stop()
+                pygame.mixer.quit()
 
 # Function to manage TTS with additional responses for long text
 def TextToSpeech(Text, func=lambda _: None):  # Changed from lambda: None
-    """Splits long text and plays only the first part, printing the rest."""
-    Data = Text.split(".")  # Split text into sentences
-
-    responses = [
-        "The rest of the result has been printed to the chat screen, kindly check it out sir.",
-        "The rest of the text is now on the chat screen, sir, please check it.",
-        "You can see the rest of the text on the chat screen, sir.",
-        "The remaining part of the text is now on the chat screen, sir.",
-        "Sir, you'll find more text on the chat screen for you to see.",
-        "The rest of the answer is now on the chat screen, sir.",
-        "Sir, please look at the chat screen, the rest of the answer is there.",
-        "You'll find the complete answer on the chat screen, sir.",
-        "The next part of the text is on the chat screen, sir.",
-        "Sir, please check the chat screen for more information.",
-    ]
-
-    # If text is long, read part of it and show the rest in the chat
-    if len(Data) > 4 and len(Text) > 250:
-        short_text = ". ".join(Data[:2]) + ". " + random.choice(responses)
-        TTS(short_text, func)
-    else:
-        TTS(Text, func)
+    """Speaks the text sentence by sentence; long text stops after the first few, the rest is on the chat screen."""
+    Speech = SpeechPipeline(func)
+    Speech.feed(Text)
+    Speech.close()
+    Speech.wait()
 
 # Main execution loop
 if __name__ == "__main__":
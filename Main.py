@@ -4,25 +4,31 @@ from Frontend.GUI import (
     GraphicalUserInterface,  
     SetAssistantStatus,  
     ShowTextToScreen,  
+    UpdateTextOnScreen,  
     TempDirectoryPath,  
     SetMicrophoneStatus,  
     AnswerModifier,  
     QueryModifier,  
     GetMicrophoneStatus,  
-    GetAssistantStatus  
+    GetAssistantStatus,  
+    WaitForMicrophoneStatus,  
+    Journal  
 )  
-from Backend.Model import FirstLayerDMM  
-from Backend.RealtimeSearchEngine import RealtimeSearchEngine  
+from Backend.Model import FirstLayerDMMStream, DecisionCachePersist, SaveDecisionCache  
+from Backend.RealtimeSearchEngine import RealtimeSearchEngineStream, GoogleSearch  
 from Backend.Automation import Automation  
+from Backend.DecisionExecutor import DecisionExecutor  
 from Backend.SpeechToText import SpeechRecognitionSystem as SpeechRecognition 
-from Backend.Chatbot import ChatBot  
-from Backend.TextToSpeech import TextToSpeech  
+from Backend.Chatbot import ChatBotStream, Responses, SaveResponseCache  
+from Backend.TextToSpeech import SpeechPipeline  
+from Backend.ConversationStore import Conversation  
+from Backend.ChatTranscript import ChatTranscript  
 from dotenv import dotenv_values  
 from asyncio import run  
-from time import sleep  
+from concurrent.futures import ThreadPoolExecutor  
+from time import sleep, monotonic  
 import subprocess  
 import threading  
-import json  
 import os  
 
 env_vars = dotenv_values(".env")  
@@ -32,43 +38,48 @@ DefaultMessage = f'''{Username} : Hello {Assistantname}, How are you?
 {Assistantname} : Welcome {Username}. I am doing well. How may i help you?...'''  
 subprocesses = []  
 Functions = ["open", "close", "play", "system", "content", "google search", "youtube search"]  
+StartupChatMessages = int(env_vars.get("StartupChatMessages", 40))  # Messages painted before the window opens
+StreamUpdateInterval = 0.05  # Seconds between chat view refreshes while an answer streams in
+
+# SpeculativeSearch=True starts the Google search for the spoken query while
+# the decision model is still classifying it. The results are reused when the
+# decision is realtime and dropped otherwise; the counters show how often the
+# extra scrape paid off.
+SpeculativeSearch = str(env_vars.get("SpeculativeSearch", "False")).lower() == "true"
+Speculation = {"started": 0, "useful": 0, "wasted": 0, "cancelled": 0}
+SpeculationLock = threading.Lock()  # Branches resolve speculations on executor threads
+SpeculationPool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="Speculation")
+
+def FormatChatMessage(entry):
+    Name = Username if entry["role"] == "user" else Assistantname
+    return f"{Name} : {AnswerModifier(entry['content'])}"
+
+# Formatted copy of the chat log, appended to as the log grows so startup
+# never has to re-format the whole history.
+Transcript = ChatTranscript(TempDirectoryPath('Database.jsonl'), FormatChatMessage)
 
 def ShowDefaultChatIfNoChats():
-    File = open(r'Data\ChatLog.json', "r", encoding='utf-8')  
-    if len(File.read()) < 5:  
-        with open(TempDirectoryPath('Database.data'), 'w', encoding='utf-8') as file:  
-            file.write("")
-    
-    with open(TempDirectoryPath('Responses.data'), 'w', encoding='utf-8') as file:
-        file.write(DefaultMessage)
+    if len(Conversation) == 0:  
+        ShowTextToScreen(DefaultMessage)
 
 def ReadChatLogJson():
-    with open(r'Data\ChatLog.json', 'r', encoding='utf-8') as file:
-        chatLog_data = json.load(file)
-    return chatLog_data
+    return Conversation.all()
 
 def ChatLogIntegration():
-    json_data = ReadChatLogJson()
-    formatted_chatlog = ""
-    for entry in json_data:
-        if entry["role"] == "user":
-            formatted_chatlog += f"User: {entry['content']}\n"
-        elif entry["role"] == "assistant":
-            formatted_chatlog += f"Assistant: {entry['content']}\n"
-    formatted_chatlog = formatted_chatlog.replace("User", Username + " ")
-    formatted_chatlog = formatted_chatlog.replace("Assistant", Assistantname + " ")
-    
-    with open(TempDirectoryPath('Database.data'), 'w', encoding='utf-8') as file:
-        file.write(AnswerModifier(formatted_chatlog))
+    # The transcript is normally already in step with the log; it is only
+    # rebuilt (once) when it is missing or its newest line does not match.
+    LastEntry = Conversation.tail(1)
+    if not Transcript.matches(LastEntry[0] if LastEntry else None):
+        Transcript.rebuild(ReadChatLogJson())
+    Conversation.subscribe(Transcript.on_change)
 
 def ShowChatsOnGUI():
-    with open(TempDirectoryPath('Database.data'), "r", encoding='utf-8') as file:
-        Data = file.read()
-        if len(str(Data)) > 0:
-            lines = Data.split('\n')
-            result = '\n'.join(lines)
-            with open(TempDirectoryPath('Responses.data'), "w", encoding='utf-8') as out_file:
-                out_file.write(result)
+    # Paint only the newest messages; older ones are read back from the
+    # transcript when the user scrolls up in the chat view.
+    Recent = Transcript.tail(StartupChatMessages)
+    for Message in Recent:
+        ShowTextToScreen(Message)
+    Journal.attach_history(Transcript.reader(), len(Recent))  # Fixed to the lines painted now
 
 def InitialExecution():
     SetMicrophoneStatus("False")
@@ -79,87 +90,152 @@ def InitialExecution():
 
 InitialExecution()
 
-def MainExecution():
-    TaskExecution = False
-    ImageExecution = False
-    ImageGenerationQuery = ""
+def RunAutomation(Task):
+    # Each automation branch gets its own event loop on its worker thread.
+    return run(Automation([Task]).execute())
+
+def GenerateImage(Task):
+    with open(r"Frontend\Files\ImageGeneration.data", "w") as file:
+        file.write(f"{Task},True")
+    try:
+        p1 = subprocess.Popen(
+            ['python', r'Backend\ImageGeneration.py'],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            stdin=subprocess.PIPE,
+            shell=False
+        )
+        subprocesses.append(p1)
+    except Exception as e:
+        print(f"Error starting ImageGeneration.py: {e}")
+
+def GeneralAnswer(Task):
+    return ChatBotStream(QueryModifier(Task.replace("general ", "", 1)))
+
+def RealtimeAnswer(Task, SearchResults=None):
+    return RealtimeSearchEngineStream(QueryModifier(Task.replace("realtime ", "", 1)), SearchResults)
+
+def ExitAnswer(Task):
+    return ChatBotStream(QueryModifier("Okay, Bye!"))
+
+# Shown and spoken when an answer branch fails before producing any text.
+FailedAnswer = "Sorry, I couldn't get an answer for that just now. Please try again."
+
+# Every task of a decision starts as soon as the decision model emits it:
+# automation and image generation run in the background, and all general and
+# realtime answers are generated at the same time, then shown and spoken in
+# decision order. A multi-intent request takes about as long as its slowest
+# branch instead of the sum of all of them.
+Executor = DecisionExecutor(
+    [(func, RunAutomation, False) for func in Functions]
+    + [("generate image", GenerateImage, False), ("general", GeneralAnswer, True), ("realtime", RealtimeAnswer, True), ("exit", ExitAnswer, True)],
+    fallback=FailedAnswer
+)
+
+def CountSpeculation(Counter):
+    with SpeculationLock:
+        Speculation[Counter] += 1
+
+def StartSpeculativeSearch(Query):
+    # Plain commands never need a search, so they are not speculated on.
+    if not SpeculativeSearch or any(Query.lower().startswith(func) for func in Functions):
+        return None
+    CountSpeculation("started")
+    return SpeculationPool.submit(GoogleSearch, QueryModifier(Query))
+
+def ResolveSpeculation(Future, Useful):
+    # Returns the speculative search results when the decision can use them.
+    if Future is None:
+        return None
+    if Useful:
+        try:
+            Results = Future.result()
+            CountSpeculation("useful")
+            return Results
+        except Exception as e:
+            print(f"Speculative search failed: {e}")
+    if Future.cancel():
+        CountSpeculation("cancelled")
+    else:
+        CountSpeculation("wasted")
+    return None
+
+def SpeakAndShow(Pieces, Prefix):
+    # Speech starts with the first complete sentence while the rest of the
+    # answer is still streaming onto the screen.
+    Speech = SpeechPipeline()
+    Answer = StreamToScreen(Speech.follow(Pieces), Prefix)
+    Speech.wait()
+    return Answer
 
+def StreamToScreen(Pieces, Prefix):
+    # Shows the answer as soon as its first token arrives and keeps rewriting
+    # that one chat message as the rest streams in; returns the full answer.
+    Seq = None
+    Answer = ""
+    LastUpdate = 0.0
+    for Piece in Pieces:
+        Answer += Piece
+        if Seq is None:
+            SetAssistantStatus("Answering ...")
+            Seq = ShowTextToScreen(f"{Prefix}{AnswerModifier(Answer)}")
+            LastUpdate = monotonic()
+        elif monotonic() - LastUpdate >= StreamUpdateInterval:
+            UpdateTextOnScreen(Seq, f"{Prefix}{AnswerModifier(Answer)}")
+            LastUpdate = monotonic()
+    Answer = AnswerModifier(Answer.strip().replace("</s>", ""))
+    if Seq is None:
+        ShowTextToScreen(f"{Prefix}{Answer}")
+    else:
+        UpdateTextOnScreen(Seq, f"{Prefix}{Answer}", Final=True)
+    return Answer
+
+def Shutdown(Code=1):
+    # os._exit skips atexit handlers, so queued history writes and the
+    # decision and answer caches are saved here before leaving.
+    Conversation.flush()
+    if DecisionCachePersist:
+        SaveDecisionCache()
+    if Responses:
+        SaveResponseCache()
+    os._exit(Code)
+
+def MainExecution():
     SetAssistantStatus("Listening ...")
     Query = SpeechRecognition()
     ShowTextToScreen(f"{Username} : {Query}")
     SetAssistantStatus("Thinking ...")
-    Decision = FirstLayerDMM(Query)
-    
+    Speculative = StartSpeculativeSearch(Query)
+    Decision = []
+    Run = Executor.run()
+    for Task in FirstLayerDMMStream(Query):
+        Decision.append(Task)
+        if Task.startswith("realtime") and Speculative is not None:
+            # The first realtime branch picks up the search started before the decision.
+            Run.submit(Task, lambda Task, Future=Speculative: RealtimeAnswer(Task, ResolveSpeculation(Future, True)))
+            Speculative = None
+        else:
+            Run.submit(Task)
+
     print(f"\nDecision : {Decision}\n")
-    
-    G = any(i.startswith("general") for i in Decision)
-    R = any(i.startswith("realtime") for i in Decision)
-    Merged_query = " and ".join(
-        " ".join(i.split()[1:]) for i in Decision 
-        if i.startswith("general") or i.startswith("realtime")
-    )
-    
-    for queries in Decision:
-        if "generate " in queries:
-            ImageGenerationQuery = str(queries)
-            ImageExecution = True
-            
-    for queries in Decision:
-        if not TaskExecution and any(queries.startswith(func) for func in Functions):
-            run(Automation(list(Decision)))
-            TaskExecution = True
-
-    if ImageExecution:
-        with open(r"Frontend\Files\ImageGeneration.data", "w") as file:
-            file.write(f"{ImageGenerationQuery},True")
-        try:
-            p1 = subprocess.Popen(
-                ['python', r'Backend\ImageGeneration.py'],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                stdin=subprocess.PIPE,
-                shell=False
-            )
-            subprocesses.append(p1)
-        except Exception as e:
-            print(f"Error starting ImageGeneration.py: {e}")
-
-    if (G and R) or R:
-        SetAssistantStatus("Searching ...")
-        Answer = RealtimeSearchEngine(QueryModifier(Merged_query))
-        ShowTextToScreen(f"{Assistantname}: {Answer}")
-        SetAssistantStatus("Answering ...")
-        TextToSpeech(Answer)
-        return True
-    
-    else:
-        for Queries in Decision:
-            if "general" in Queries:
-                SetAssistantStatus("Thinking ...")
-                QueryFinal = Queries.replace("general ", "")
-                Answer = ChatBot(QueryModifier(QueryFinal))
-                ShowTextToScreen(f"{Assistantname} : {Answer}")
-                SetAssistantStatus("Answering ...")
-                TextToSpeech(Answer)
-                return True
-                
-            elif "realtime" in Queries:
-                SetAssistantStatus("Searching ...")
-                QueryFinal = Queries.replace("realtime ", "")
-                Answer = RealtimeSearchEngine(QueryModifier(QueryFinal))
-                ShowTextToScreen(f"{Assistantname} : {Answer}")
-                SetAssistantStatus("Answering ...")
-                TextToSpeech(Answer)
-                return True
-                
-            elif "exit" in Queries:
-                QueryFinal = "Okay, Bye!"
-                Answer = ChatBot(QueryModifier(QueryFinal))
-                ShowTextToScreen(f"{Assistantname} : {Answer}")
-                SetAssistantStatus("Answering ...")
-                TextToSpeech(Answer)
-                SetAssistantStatus("Answering ...")
-                os._exit(1)  # Corrected from os_exit to os._exit
+
+    if Speculative is not None:
+        ResolveSpeculation(Speculative, False)
+    with SpeculationLock:
+        Counters = dict(Speculation)
+    if Counters["started"]:
+        print(f"Speculation : {Counters}")
+
+    for Branch in Run.answers():
+        if not Branch.done.is_set():
+            SetAssistantStatus("Searching ..." if Branch.task.startswith("realtime") else "Thinking ...")
+        SpeakAndShow(Branch.stream(), f"{Assistantname} : ")
+
+    print(f"Branches : {Run.report()}")
+
+    if any(Task.startswith("exit") for Task in Decision):
+        Shutdown()
+    return True
 
 def FirstThread():
     while True:
@@ -170,11 +246,12 @@ def FirstThread():
         else:
             AIStatus = GetAssistantStatus()
             
-            if "Available ..." in AIStatus:
-                sleep(0.1)
-            else:
+            if "Available ..." not in AIStatus:
                 SetAssistantStatus("Available ...")
 
+            # Sleep until the mic is toggled on instead of polling
+            WaitForMicrophoneStatus("True")
+
 def SecondThread():
     GraphicalUserInterface()
 
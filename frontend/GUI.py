@@ -1,17 +1,51 @@
-from PyQt5.QtWidgets import QApplication, QMainWindow, QTextEdit, QStackedWidget, QWidget, QLineEdit, QGridLayout, QVBoxLayout, QHBoxLayout, QPushButton, QFrame, QLabel, QSizePolicy
-from PyQt5.QtGui import QIcon, QPainter, QMovie, QColor, QPixmap, QTextCharFormat, QFont, QImage, QPen, QTextBlockFormat
-from PyQt5.QtCore import Qt, QSize, QTimer
+from PyQt5.QtWidgets import QApplication, QMainWindow, QStackedWidget, QWidget, QLineEdit, QGridLayout, QVBoxLayout, QHBoxLayout, QPushButton, QFrame, QLabel, QSizePolicy, QListView, QStyledItemDelegate, QAbstractItemView
+from PyQt5.QtGui import QIcon, QPainter, QMovie, QColor, QPixmap, QFont, QImage, QPen, QFontMetrics
+from PyQt5.QtCore import Qt, QSize, QTimer, QObject, QEvent, pyqtSignal, pyqtSlot, QAbstractListModel, QModelIndex, QRect
 from dotenv import dotenv_values
+from Backend.StateBus import StateBus
+from Backend.ChatJournal import ChatJournal
 import sys
 import os
+import time
 
 env_vars = dotenv_values(".env")
 Assistantname = env_vars.get("Assistantname")
 current_dir = os.getcwd()
-Old_chat_message = ""
 TempDirPath = f"{current_dir}/Frontend/Files"
 GraphicsDirPath = f"{current_dir}/Frontend/Graphics"
 
+# Shared in-memory state for the GUI and Main.py. The legacy *.data files are
+# still written on every change unless StateFileMirror=False in .env.
+StateFileMirror = str(env_vars.get("StateFileMirror", "True")).lower() != "false"
+Bus = StateBus(mirror_dir=TempDirPath if StateFileMirror else None)
+
+# Append-only log of everything shown in the chat view. The GUI keeps the last
+# sequence number it rendered and only reads newer entries.
+Journal = ChatJournal(os.path.join(TempDirPath, "Responses.journal"))
+
+# Number of chat messages kept rendered in the chat view; older ones are read
+# back from the journal a page at a time when the user scrolls up.
+ChatWindowSize = int(env_vars.get("ChatWindowSize", 200))
+ChatPageSize = 50
+
+# Idle CPU budget for the whole process, in percent of one core. Set
+# MeasureIdleCPU=True in .env to log the measured value every 10 seconds.
+IdleCpuTarget = 1.0
+MeasureIdleCPU = str(env_vars.get("MeasureIdleCPU", "False")).lower() == "true"
+
+# Bridges StateBus changes into Qt. Signals emitted from the backend thread are
+# delivered to the GUI thread as queued events, so widgets only do work when a
+# value actually changes instead of polling on a timer.
+class StateSignals(QObject):
+    statusChanged = pyqtSignal(str)
+    responsesChanged = pyqtSignal(int)
+    responseUpdated = pyqtSignal(int)
+
+Signals = StateSignals()
+Bus.subscribe("Status", lambda key, value: Signals.statusChanged.emit(value))
+Journal.subscribe(lambda seq: Signals.responsesChanged.emit(seq))
+Journal.subscribe_updates(lambda seq: Signals.responseUpdated.emit(seq))
+
 def AnswerModifier(Answer):
     lines = Answer.split("\n")
     non_empty_lines = [line for line in lines if line.strip()]
@@ -36,27 +70,20 @@ def QueryModifier(query):
     return new_query.capitalize()
 
 def SetMicrophoneStatus(Command):
-    with open(rf'{TempDirPath}/Mic.data', "w", encoding='utf-8') as file:
-        file.write(Command)
+    Bus.set("Mic", Command)
 
 def GetMicrophoneStatus():
-    with open(rf"{TempDirPath}/Mic.data", "r", encoding="utf-8") as file:
-        Status = file.read()
-    return Status
+    return Bus.get("Mic")
 
-def SetAssistantStatus(Status):
-    with open(rf"{TempDirPath}/Status.data", "w", encoding="utf-8") as file:
-        file.write(Status)
+def WaitForMicrophoneStatus(Command, timeout=None):
+    """Block until the mic status equals Command; the mic toggle wakes waiters immediately"""
+    return Bus.wait_for("Mic", lambda Status: Status == Command, timeout=timeout)
 
-def GetAssistantStatus():
-    with open(f"{TempDirPath}/Status.data", "r", encoding="utf-8") as file:
-        Status = file.read()
-    return Status
+def SetAssistantStatus(Status):
+    Bus.set("Status", Status)
 
 def GetAssistantStatus():
-    with open(rf"{TempDirPath}\Status.data", "r", encoding="utf-8") as file:
-        Status = file.read()
-    return Status
+    return Bus.get("Status")
 
 def MicButtonInitiated():
     SetMicrophoneStatus("False")
@@ -73,8 +100,97 @@ def TempDirectoryPath(Filename):
     return Path
 
 def ShowTextToScreen(Text):
-    with open(rf"{TempDirPath}\Responses.data", "w", encoding="utf-8") as file:
-        file.write(Text)
+    """Show a new chat message; returns its journal sequence number (None for blank text)"""
+    Bus.set("Responses", Text)  # Latest text, mirrored to Responses.data for legacy readers
+    if len(Text) > 1:
+        return Journal.append(Text)
+    return None
+
+def UpdateTextOnScreen(Seq, Text, Final=False):
+    """Rewrite a message already on screen, e.g. an answer that is still streaming in"""
+    Bus.set("Responses", Text)
+    Journal.update(Seq, Text, final=Final)
+
+class ChatListModel(QAbstractListModel):
+    """Holds a sliding window of (seq, text) journal entries for the chat view"""
+    def __init__(self, window=ChatWindowSize, parent=None):
+        super().__init__(parent)
+        self.window = window
+        self.rows = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            return self.rows[index.row()][1]
+        if role == Qt.ForegroundRole:
+            return QColor("White")
+        return None
+
+    def first_seq(self):
+        return self.rows[0][0] if self.rows else Journal.last_seq + 1
+
+    def last_seq(self):
+        return self.rows[-1][0] if self.rows else 0
+
+    def append_rows(self, entries):
+        """Add newer entries at the bottom and drop the oldest beyond the window"""
+        if not entries:
+            return
+        self.beginInsertRows(QModelIndex(), len(self.rows), len(self.rows) + len(entries) - 1)
+        self.rows.extend(entries)
+        self.endInsertRows()
+        self.trim_top()
+
+    def prepend_rows(self, entries):
+        """Add older entries at the top and drop the newest beyond the window"""
+        if not entries:
+            return
+        self.beginInsertRows(QModelIndex(), 0, len(entries) - 1)
+        self.rows[:0] = entries
+        self.endInsertRows()
+        excess = len(self.rows) - self.window
+        if excess > 0:
+            self.beginRemoveRows(QModelIndex(), len(self.rows) - excess, len(self.rows) - 1)
+            del self.rows[-excess:]
+            self.endRemoveRows()
+
+    def update_row(self, seq, text):
+        """Replace the text of a rendered entry; returns its index, or None if it is not in the window"""
+        row = seq - self.rows[0][0] if self.rows else -1
+        if not 0 <= row < len(self.rows) or self.rows[row][0] != seq:
+            return None
+        self.rows[row] = (seq, text)
+        index = self.index(row, 0)
+        self.dataChanged.emit(index, index)
+        return index
+
+    def trim_top(self):
+        excess = len(self.rows) - self.window
+        if excess > 0:
+            self.beginRemoveRows(QModelIndex(), 0, excess - 1)
+            del self.rows[:excess]
+            self.endRemoveRows()
+
+class ChatItemDelegate(QStyledItemDelegate):
+    """Paints one chat message as word-wrapped text with the old 10px margins"""
+    Margin = 10
+
+    def paint(self, painter, option, index):
+        painter.save()
+        painter.setFont(option.font)
+        painter.setPen(index.data(Qt.ForegroundRole))
+        rect = option.rect.adjusted(self.Margin, self.Margin, -self.Margin, 0)
+        painter.drawText(rect, Qt.TextWordWrap | Qt.AlignLeft | Qt.AlignTop, index.data(Qt.DisplayRole))
+        painter.restore()
+
+    def sizeHint(self, option, index):
+        width = max(option.rect.width(), self.parent().viewport().width()) - 2 * self.Margin
+        bounds = QFontMetrics(option.font).boundingRect(QRect(0, 0, max(width, 1), 100000), Qt.TextWordWrap, index.data(Qt.DisplayRole))
+        return QSize(width, bounds.height() + self.Margin)
 
 class ChatSection(QWidget):
     def __init__(self):
@@ -83,23 +199,28 @@ class ChatSection(QWidget):
         layout.setContentsMargins(-10, 40, 100, 0)  # Fixed: Added bottom margin
         layout.setSpacing(-100)
 
-        self.chat_text_edit = QTextEdit()
-        self.chat_text_edit.setReadOnly(True)
-        self.chat_text_edit.setTextInteractionFlags(Qt.NoTextInteraction)
-        self.chat_text_edit.setFrameStyle(QFrame.NoFrame)
-
-        layout.addWidget(self.chat_text_edit)
+        # Model/view chat list: only ChatWindowSize messages are kept in the
+        # model, so layout and memory stay flat however long the session runs.
+        self.chat_model = ChatListModel(parent=self)
+        self.chat_list = QListView()
+        self.chat_list.setModel(self.chat_model)
+        self.chat_list.setItemDelegate(ChatItemDelegate(self.chat_list))
+        self.chat_list.setSelectionMode(QAbstractItemView.NoSelection)
+        self.chat_list.setFocusPolicy(Qt.NoFocus)
+        self.chat_list.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.chat_list.setResizeMode(QListView.Adjust)
+        self.chat_list.setWordWrap(True)
+        self.chat_list.setFrameStyle(QFrame.NoFrame)
+        self.chat_list.verticalScrollBar().valueChanged.connect(self.onScroll)
+        self.chat_list.verticalScrollBar().rangeChanged.connect(self.onRangeChanged)
+
+        layout.addWidget(self.chat_list)
         self.setStyleSheet("background-color: black;")
         layout.setSizeConstraint(QVBoxLayout.SetDefaultConstraint)
         layout.setStretch(1, 1)
 
         self.setSizePolicy(QSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding))
 
-        text_color = QColor(Qt.blue)
-        text_color_text = QTextCharFormat()
-        text_color_text.setForeground(text_color)
-        self.chat_text_edit.setCurrentCharFormat(text_color_text)
-
         self.gif_label = QLabel()
         self.gif_label.setStyleSheet("border: none;")
         movie = QMovie(GraphicsDirectoryPath("Jarvis.gif"))
@@ -125,13 +246,15 @@ class ChatSection(QWidget):
         layout.setSpacing(-10)
         layout.addWidget(self.gif_label)
 
-        self.chat_text_edit.setFont(font)
+        self.chat_list.setFont(font)
 
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.loadMessages)
-        self.timer.timeout.connect(self.SpeechRecogText)
-        self.timer.start(5)
-        self.chat_text_edit.viewport().installEventFilter(self)
+        Signals.responsesChanged.connect(self.loadMessages)
+        Signals.responseUpdated.connect(self.updateMessage)
+        Signals.statusChanged.connect(self.SpeechRecogText)
+        self.chat_model.append_rows(Journal.read_before(Journal.last_seq + 1, ChatWindowSize))
+        self.chat_list.scrollToBottom()
+        self.SpeechRecogText(Bus.get("Status"))
+        self.chat_list.viewport().installEventFilter(self)
         self.setStyleSheet("""
             QScrollBar:vertical {
                 border: none;
@@ -170,24 +293,73 @@ class ChatSection(QWidget):
             }
         """)
 
-    def loadMessages(self):
-        global Old_chat_message
-        with open(TempDirectoryPath("Responses.data"), "r", encoding="utf-8") as file:
-            messages = file.read()
-            if messages is None:  # Fixed: Proper None check
-                pass
-            elif len(messages) <= 1:
-                pass
-            elif str(Old_chat_message) == str(messages):
-                pass
-            else:
-                self.addMessage(message=messages, color="White")
-                Old_chat_message = messages
-
-    def SpeechRecogText(self):
-        with open(TempDirectoryPath("Status.data"), "r", encoding="utf-8") as file:
-            messages = file.read()
-            self.label.setText(messages)            
+    def atBottom(self):
+        scroll_bar = self.chat_list.verticalScrollBar()
+        return scroll_bar.value() >= scroll_bar.maximum()
+
+    @pyqtSlot(int)
+    def loadMessages(self, seq):
+        # Render only the entries added since the last rendered one; several
+        # appends between two signals are picked up together. While the user
+        # is reading older history new messages wait until they scroll down.
+        if not self.atBottom() and self.chat_model.last_seq() < Journal.last_seq - 1:
+            return
+        follow = self.atBottom()
+        while self.chat_model.last_seq() < Journal.last_seq:
+            entries = Journal.read_since(self.chat_model.last_seq(), ChatPageSize)
+            if not entries:
+                break
+            self.chat_model.append_rows(entries)
+        if follow:
+            self.chat_list.scrollToBottom()
+
+    @pyqtSlot(int)
+    def updateMessage(self, seq):
+        # A streaming answer grew; repaint just that row and re-measure its height.
+        entries = Journal.read_since(seq - 1, 1)
+        if not entries:
+            return
+        follow = self.atBottom()
+        index = self.chat_model.update_row(seq, entries[0][1])
+        if index is not None:
+            self.chat_list.itemDelegate().sizeHintChanged.emit(index)
+            if follow:
+                self.chat_list.scrollToBottom()
+
+    def loadOlder(self):
+        # Lazily page older history in from the journal (and the saved
+        # transcript behind it), keeping the top message in view.
+        older = Journal.read_before(self.chat_model.first_seq(), ChatPageSize)
+        if older:
+            self.chat_model.prepend_rows(older)
+            self.chat_list.scrollTo(self.chat_model.index(len(older), 0), QAbstractItemView.PositionAtTop)
+
+    @pyqtSlot(int, int)
+    def onRangeChanged(self, minimum, maximum):
+        # Rows that do not fill the view leave no scroll range, so onScroll
+        # never sees the top; keep paging in until they do or history ends.
+        if maximum == 0 and len(self.chat_model.rows) < self.chat_model.window:
+            self.loadOlder()
+
+    def eventFilter(self, obj, event):
+        # Scrolling up while already at the top pages in more history too.
+        if obj is self.chat_list.viewport() and event.type() == QEvent.Wheel and event.angleDelta().y() > 0:
+            scroll_bar = self.chat_list.verticalScrollBar()
+            if scroll_bar.value() == scroll_bar.minimum():
+                self.loadOlder()
+        return super(ChatSection, self).eventFilter(obj, event)
+
+    @pyqtSlot(int)
+    def onScroll(self, value):
+        scroll_bar = self.chat_list.verticalScrollBar()
+        if value == scroll_bar.minimum():
+            self.loadOlder()
+        elif value == scroll_bar.maximum() and self.chat_model.last_seq() < Journal.last_seq:
+            self.chat_model.append_rows(Journal.read_since(self.chat_model.last_seq(), ChatPageSize))
+
+    @pyqtSlot(str)
+    def SpeechRecogText(self, status):
+        self.label.setText(status)
 
     def load_icon(self, path, width=60, height=60):
         pixmap = QPixmap(path)
@@ -203,18 +375,6 @@ class ChatSection(QWidget):
             MicButtonClosed()
         self.toggled = not self.toggled
 
-    def addMessage(self, message, color):
-        cursor = self.chat_text_edit.textCursor()
-        format = QTextCharFormat()
-        formatm = QTextBlockFormat()
-        formatm.setTopMargin(10)
-        formatm.setLeftMargin(10)
-        format.setForeground(QColor(color))
-        cursor.setCharFormat(format)
-        cursor.setBlockFormat(formatm)
-        cursor.insertText(message + "\n", format)
-        self.chat_text_edit.setTextCursor(cursor)
-
 class InitialScreen(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -261,15 +421,13 @@ class InitialScreen(QWidget):
         self.setFixedWidth(screen_width)
         self.setStyleSheet("background-color: black;")
         
-        # Timer Setup
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.SpeechRecognText)
-        self.timer.start(5)
+        # Status updates are pushed from the backend thread
+        Signals.statusChanged.connect(self.SpeechRecognText)
+        self.SpeechRecognText(Bus.get("Status"))
 
-    def SpeechRecognText(self):
-        with open(TempDirectoryPath('Status.data'), "r", encoding='utf-8') as file:
-            messages = file.read()
-            self.label.setText(messages)
+    @pyqtSlot(str)
+    def SpeechRecognText(self, status):
+        self.label.setText(status)
 
     def load_icon(self, path, width=60, height=60):
         pixmap = QPixmap(path)
@@ -457,10 +615,29 @@ class MainWindow(QMainWindow):
         self.setMenuWidget(top_bar)
         self.setCentralWidget(stacked_widget)
 
+class IdleCpuMonitor(QObject):
+    """Logs process CPU usage so idle load can be checked against IdleCpuTarget"""
+    def __init__(self, interval_ms=10000, parent=None):
+        super().__init__(parent)
+        self.last_cpu = time.process_time()
+        self.last_wall = time.monotonic()
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.sample)
+        self.timer.start(interval_ms)
+
+    def sample(self):
+        cpu, wall = time.process_time(), time.monotonic()
+        usage = 100.0 * (cpu - self.last_cpu) / max(wall - self.last_wall, 1e-6)
+        self.last_cpu, self.last_wall = cpu, wall
+        verdict = "OK" if usage <= IdleCpuTarget else "ABOVE TARGET"
+        print(f"CPU: {usage:.2f}% of one core (target {IdleCpuTarget:.1f}%, status '{Bus.get('Status')}') {verdict}")
+
 def GraphicalUserInterface():
     app = QApplication(sys.argv)
     window = MainWindow()  # Added missing = operator
     window.show()
+    if MeasureIdleCPU:
+        window.cpu_monitor = IdleCpuMonitor(parent=window)
     sys.exit(app.exec_())
 
 if __name__ == "__main__":  # Fixed name check